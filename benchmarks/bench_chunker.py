@@ -0,0 +1,113 @@
+"""Throughput and peak memory of the streaming chunker versus the old chunk_text loop.
+
+Writes a synthetic UTF-8 corpus, then runs each chunker in its own
+subprocess so peak RSS is measured independently.
+
+    python benchmarks/bench_chunker.py --mb 300 --legacy-mb 20
+"""
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORDS = [
+    "building", "information", "model", "the", "of", "and", "IFC", "LOD500",
+    "as-built", "construction", "document", "approved", "café", "naïve",
+    "中文", "ε=mc²", "2024", "—", "(see", "section", "4.2)", "data,", "exchange."
+]
+
+
+def legacy_chunk_text(file_path, chunk_size=500, overlap=100):
+    """chunk_text as it was before the streaming chunker"""
+    import tiktoken
+
+    enc = tiktoken.encoding_for_model("gpt-4")
+    buffer = ""
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        while True:
+            chunk = f.read(1024*1024)
+            if not chunk:
+                break
+            buffer += chunk
+            tokens = enc.encode(buffer)
+
+            while len(tokens) > chunk_size:
+                yield enc.decode(tokens[:chunk_size])
+                tokens = tokens[chunk_size - overlap:]
+                buffer = enc.decode(tokens)
+
+
+def streaming_chunk_text(file_path, chunk_size=500, overlap=100):
+    import chunker
+
+    for _, text, _ in chunker.stream_chunks(file_path, chunk_size, overlap):
+        yield text
+
+
+def write_corpus(path, megabytes, seed=0):
+    rng = random.Random(seed)
+    target = megabytes * 1024 * 1024
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target:
+            words = rng.choices(WORDS, k=rng.randint(40, 200))
+            paragraph = " ".join(words) + "\n\n"
+            f.write(paragraph)
+            written += len(paragraph.encode("utf-8"))
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_one(name, file_path):
+    """Child process: run one chunker and print a result line"""
+    chunk_fn = {"legacy": legacy_chunk_text, "streaming": streaming_chunk_text}[name]
+    size_mb = os.path.getsize(file_path) / (1024 * 1024)
+
+    start = time.perf_counter()
+    count = sum(1 for _ in chunk_fn(file_path))
+    elapsed = time.perf_counter() - start
+
+    print(f"{name:>10}: {size_mb:8.1f} MB  {count:9d} chunks  {elapsed:8.2f}s  "
+          f"{size_mb / elapsed:7.2f} MB/s  peak RSS {peak_rss_mb():8.1f} MB")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=int, default=300, help="corpus size for the streaming chunker")
+    parser.add_argument("--legacy-mb", type=int, default=20,
+                        help="corpus size for the old loop, which is quadratic per read (0 to skip)")
+    parser.add_argument("--run", choices=["legacy", "streaming"], help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_one(args.run, args.file)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [("streaming", args.mb)]
+        if args.legacy_mb:
+            runs.insert(0, ("legacy", args.legacy_mb))
+            runs.insert(1, ("streaming", args.legacy_mb))
+
+        for name, megabytes in runs:
+            path = os.path.join(tmp, f"corpus-{megabytes}.txt")
+            if not os.path.exists(path):
+                write_corpus(path, megabytes)
+            subprocess.run([sys.executable, __file__, "--run", name, "--file", path], check=True)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,54 @@
+"""Offline benchmark for the batched embedder in embeddings.py.
+
+Uses the stub backend (FAKE_EMBEDDINGS) to compare one request per chunk,
+as process_documents used to do, with token-budgeted concurrent batches.
+
+    python benchmarks/bench_embeddings.py --chunks 5000 --latency 0.2
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import embeddings
+
+
+def run(items, max_items, workers):
+    embeddings.BATCH_MAX_ITEMS = max_items
+    embeddings.BATCH_WORKERS = workers
+    start = time.perf_counter()
+    count = sum(1 for _ in embeddings.embed_items(None, items))
+    return count, time.perf_counter() - start
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--chunk-chars", type=int, default=2000, help="about 500 tokens of English text")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per request")
+    parser.add_argument("--dim", type=int, default=64, help="vector size (kept small so hashing doesn't dominate)")
+    parser.add_argument("--per-chunk-limit", type=int, default=200, help="chunks to time for the per-chunk baseline")
+    args = parser.parse_args()
+
+    embeddings.FAKE_EMBEDDINGS = True
+    embeddings.FAKE_LATENCY = args.latency
+    embeddings.FAKE_DIM = args.dim
+    embeddings.CACHE_PATH = ""  # measure requests, not cache hits
+
+    text = ("lorem ipsum dolor sit amet " * (args.chunk_chars // 27 + 1))[:args.chunk_chars]
+    items = [(f"chunk-{i}", f"{i} {text}") for i in range(args.chunks)]
+
+    batch_items, batch_workers = embeddings.BATCH_MAX_ITEMS, embeddings.BATCH_WORKERS
+
+    baseline = items[:args.per_chunk_limit]
+    count, elapsed = run(baseline, max_items=1, workers=1)
+    print(f"  per-chunk: {count:6d} chunks in {elapsed:8.2f}s  {count / elapsed:10.1f} chunks/s")
+
+    count, elapsed = run(items, max_items=batch_items, workers=batch_workers)
+    print(f"    batched: {count:6d} chunks in {elapsed:8.2f}s  {count / elapsed:10.1f} chunks/s")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,56 @@
+"""Offline benchmark for the concurrent answer engine in main.py.
+
+Runs main.answer_questions with FAKE_PROVIDERS enabled, so no API is called,
+and compares it against the old one-call-at-a-time loop.
+
+    python benchmarks/bench_fanout.py --questions 107 --latency 0.5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+def run_sequential(items):
+    for question, context in items:
+        for model in main.LLM_MODELS:
+            main.get_llm_answer(question, context, model)
+
+
+def run_concurrent(items):
+    for _ in main.answer_questions(items):
+        pass
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=107)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per fake model call")
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+
+    main.FAKE_PROVIDERS = True
+    main.FAKE_LATENCY = args.latency
+    main.log_message = lambda message: None
+
+    items = [(f"Question {i}?", f"Context for question {i}.") for i in range(args.questions)]
+    calls = len(items) * len(main.LLM_MODELS)
+
+    runs = [("concurrent", run_concurrent)]
+    if not args.skip_sequential:
+        runs.insert(0, ("sequential", run_sequential))
+
+    print(f"{args.questions} questions x {len(main.LLM_MODELS)} models, {args.latency}s per call")
+    for name, run in runs:
+        start = time.perf_counter()
+        run(items)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>12}: {elapsed:8.2f}s  {calls / elapsed:8.1f} calls/s")
+
+
+if __name__ == "__main__":
+    main_cli()
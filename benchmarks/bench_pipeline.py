@@ -0,0 +1,262 @@
+"""End-to-end throughput of the pipeline against offline stand-ins of every API.
+
+Generates a synthetic corpus and question sheet in a temporary workspace,
+points main.py and test2.py at it, swaps their OpenAI, Anthropic, Gemini
+and Pinecone clients for the deterministic fakes in fake_services.py and
+runs chunk_text, process_documents, process_questions and test2.main in
+turn. Reports the wall time, questions/s and peak memory of each stage and
+the p50/p95 latency of each kind of call (from metrics.py), plus the
+requests, injected errors and 429s each fake service saw. Nothing leaves
+the machine and no API keys are needed.
+
+    python benchmarks/bench_pipeline.py --questions 100 --docs 20 --llm-latency 0.3 --error-rate 0.02
+    python benchmarks/bench_pipeline.py --questions 50 --llm-rpm 120 --keep-limits --json before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_services
+
+WORDS = (
+    "model building information exchange format drawing document status construction level detail "
+    "geometry element property schema project phase design review approval coordination clash "
+    "facility asset handover record survey point cloud standard requirement delivery team"
+).split()
+
+CATEGORIES = ["Definitions", "Standards", "Workflows", "Deliverables"]
+
+
+def sentence(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+    return " ".join(words).capitalize() + "."
+
+
+def write_workspace(root, docs, doc_kb, questions, seed):
+    """Documents under uploadFiles/, the question sheet and a single-file corpus under middleFiles/"""
+    rng = random.Random(seed)
+    for name in ("work", "uploadFiles", "middleFiles", "outputFiles"):
+        os.makedirs(os.path.join(root, name), exist_ok=True)
+
+    texts = []
+    for d in range(docs):
+        paragraphs = []
+        size = 0
+        while size < doc_kb * 1024:
+            paragraph = " ".join(sentence(rng) for _ in range(rng.randint(3, 8)))
+            paragraphs.append(paragraph)
+            size += len(paragraph) + 2
+        text = "\n\n".join(paragraphs)
+        texts.append(text)
+        with open(os.path.join(root, "uploadFiles", f"doc-{d:04d}.txt"), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    corpus = os.path.join(root, "middleFiles", "corpus.txt")
+    with open(corpus, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(texts))
+
+    sheet = os.path.join(root, "middleFiles", "questions.xlsx")
+    pd.DataFrame({
+        "Category": [rng.choice(CATEGORIES) for _ in range(questions)],
+        "Questions": [f"Question {q}: what does the {rng.choice(WORDS)} {rng.choice(WORDS)} cover?" for q in range(questions)],
+        "Golden Answers": [sentence(rng) for _ in range(questions)]
+    }).to_excel(sheet, index=False, engine="openpyxl")
+    return corpus, sheet
+
+
+def max_rss_mb():
+    """Peak resident set size of the process so far, if the platform reports it"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_stage(name, fn, args, items=None):
+    """Run one stage with its output captured; returns its measurements"""
+    if args.trace_memory:
+        tracemalloc.reset_peak()
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(output):
+        result = fn()
+    elapsed = time.perf_counter() - start
+
+    stage = {"stage": name, "seconds": elapsed, "peak_rss_mb": max_rss_mb()}
+    if items:
+        stage["items"] = items
+        stage["items_per_s"] = items / elapsed
+    if args.trace_memory:
+        stage["peak_python_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    if "error occurred" in output.getvalue():
+        stage["error"] = output.getvalue().strip().splitlines()[-1]
+    return stage, result
+
+
+def install_fakes(main, test2, providers, rate_limiter, args):
+    """Replace every API client with a fake; returns the fake services by name"""
+    def service(name, latency, rpm=None):
+        return fake_services.Service(name, latency, args.jitter, args.error_rate, rpm, args.seed)
+
+    services = {
+        "embeddings": service("embeddings", args.embed_latency),
+        "pinecone": service("pinecone", args.index_latency),
+        "judge": service("judge", args.judge_latency, args.judge_rpm)
+    }
+    main.client_GPT = fake_services.FakeOpenAI(services["embeddings"], dim=args.dim)
+    main.pc = fake_services.FakePinecone(services["pinecone"])
+    test2.client = fake_services.FakeOpenAI(services["judge"], name="judge")
+
+    fakes = {
+        "openai": fake_services.FakeOpenAI,
+        "anthropic": fake_services.FakeAnthropic,
+        "gemini": fake_services.FakeGenerativeModel
+    }
+    config = providers.get_config()
+    for model in main.LLM_MODELS:
+        services[model] = service(model, args.llm_latency, args.llm_rpm)
+        providers.get_provider(model)._client = fakes[config[model]["type"]](services[model], name=model)
+
+    # The configured quotas are the real accounts'; by default only the fakes' limits apply
+    if not args.keep_limits:
+        for limits in rate_limiter.PROVIDER_LIMITS.values():
+            limits["rpm"] = limits["tpm"] = None
+    rate_limiter.BASE_DELAY = args.retry_delay
+    return services
+
+
+def latency_table(snapshot):
+    rows = []
+    for stage in ("embedding", "upsert", "retrieval", "llm", "judge", "rate_limit_wait", "retry_wait"):
+        for label, stats in snapshot["stages"].get(stage, {}).items():
+            rows.append({
+                "call": stage if label == "all" else f"{stage} {label}",
+                "count": stats["count"],
+                "p50_ms": stats["p50_s"] * 1000,
+                "p95_ms": stats["p95_s"] * 1000,
+                "max_ms": stats["max_s"] * 1000
+            })
+    return rows
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--docs", type=int, default=10, help="source documents to ingest")
+    parser.add_argument("--doc-kb", type=int, default=64, help="size of each document")
+    parser.add_argument("--dim", type=int, default=256, help="embedding dimension")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per answering-model call")
+    parser.add_argument("--judge-latency", type=float, default=0.2, help="seconds per judge call")
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="seconds per embedding request")
+    parser.add_argument("--index-latency", type=float, default=0.01, help="seconds per Pinecone request")
+    parser.add_argument("--jitter", type=float, default=0.2, help="latency varies by +/- this fraction")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with a 503")
+    parser.add_argument("--llm-rpm", type=int, default=None, help="requests/min each fake model accepts")
+    parser.add_argument("--judge-rpm", type=int, default=None, help="requests/min the fake judge accepts")
+    parser.add_argument("--keep-limits", action="store_true", help="keep the client-side quotas of the config")
+    parser.add_argument("--retry-delay", type=float, default=0.1, help="rate_limiter.BASE_DELAY for the run")
+    parser.add_argument("--stream", action="store_true", help="answer with STREAM_RESPONSES")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true", help="also report peak Python heap per stage (slower)")
+    parser.add_argument("--json", help="also save the results to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary workspace")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    args = parser.parse_args()
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    root = tempfile.mkdtemp(prefix="ayvo-bench-")
+    corpus, sheet = write_workspace(root, args.docs, args.doc_kb, args.questions, args.seed)
+    cwd = os.getcwd()
+    os.chdir(os.path.join(root, "work"))  # the scripts' ../middleFiles and ../outputFiles now live in root
+
+    try:
+        import checkpoint
+        import embeddings
+        import main
+        import providers
+        import rate_limiter
+        import test2
+        import metrics
+
+        checkpoint.RESUME = False
+        embeddings.FAKE_DIM = args.dim
+        main.log_message = lambda message: None
+        main.INPUT_DIR = os.path.join(root, "uploadFiles")
+        main.FILE_PATH = corpus
+        main.INPUT_EXCEL = sheet
+        main.OUTPUT_EXCEL = "../middleFiles/results_with_all_contexts.xlsx"
+        main.VECTOR_BACKEND = "pinecone"
+        main.INDEX_NAME = "benchmark"
+        main.EMBED_DIM = args.dim
+        main.STREAM_RESPONSES = args.stream
+        services = install_fakes(main, test2, providers, rate_limiter, args)
+
+        if args.trace_memory:
+            tracemalloc.start()
+
+        print(f"{args.questions} questions x {len(main.LLM_MODELS)} models, {args.docs} documents of {args.doc_kb} KB, "
+              f"error rate {args.error_rate:.0%}, workspace {root}")
+
+        stages = []
+        corpus_mb = os.path.getsize(corpus) / (1024 * 1024)
+        stage, chunks = run_stage("chunk_text", lambda: sum(1 for _ in main.chunk_text(corpus)), args)
+        stage.update(items=chunks, items_per_s=chunks / stage["seconds"], mb_per_s=corpus_mb / stage["seconds"])
+        stages.append(stage)
+
+        index = main.open_index()
+        stages.append(run_stage("process_documents", lambda: main.process_documents(index), args)[0])
+        stages.append(run_stage("process_questions", lambda: main.process_questions(index), args, args.questions)[0])
+        stages.append(run_stage("test2.main", test2.main, args, args.questions)[0])
+
+        pipeline_seconds = sum(stage["seconds"] for stage in stages[1:])
+        results = {
+            "settings": vars(args),
+            "stages": stages,
+            "questions_per_s": args.questions / pipeline_seconds,
+            "latency": latency_table(metrics.snapshot()),
+            "services": {
+                name: {"requests": s.requests, "errors": s.errors, "rate_limited": s.rate_limited}
+                for name, s in services.items()
+            },
+            "retries": dict(rate_limiter.retry_counts)
+        }
+    finally:
+        os.chdir(cwd)
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print()
+    print(pd.DataFrame(stages).set_index("stage").round(3).to_string())
+    print(f"\nEnd to end (ingest, answer, evaluate): {pipeline_seconds:.2f}s, {results['questions_per_s']:.2f} questions/s\n")
+    print(pd.DataFrame(results["latency"]).set_index("call").round(1).to_string())
+    print()
+    print(pd.DataFrame(results["services"]).T.to_string())
+    if results["retries"]:
+        print(f"\nRetries: {results['retries']}")
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {json_path}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,94 @@
+"""Report aggregation time of test2.build_reports versus the old per-model loops, on synthetic scores.
+
+Only the aggregation is timed; no Excel files are written.
+
+    python benchmarks/bench_reports.py --questions 5000 --models 40 --categories 12
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import test2
+
+SCORES = ['Faithfulness Score', 'Answer Relevance Score', 'Context Relevance Score', 'correctness Score', 'Overall Score']
+
+
+def synthetic_results(questions, models, categories):
+    rng = np.random.default_rng(0)
+    category = rng.choice([f"Category {c}" for c in range(categories)], size=questions).tolist()
+    all_results = {}
+    for m in range(models):
+        scores = rng.integers(0, 11, size=(questions, 4)).tolist()
+        all_results[f"model-{m}"] = [
+            {
+                'Category': category[i],
+                'Questions': f"question {i}",
+                'Faithfulness Score': scores[i][0],
+                'Answer Relevance Score': scores[i][1],
+                'Context Relevance Score': scores[i][2],
+                'correctness Score': scores[i][3],
+                'Overall Score': sum(scores[i]) / 4
+            }
+            for i in range(questions)
+        ]
+    return all_results
+
+
+def legacy_reports(all_results):
+    """The aggregations of create_evaluation_report and create_comparison_report before build_reports"""
+    comparison_data = []
+    for model_name, results in all_results.items():
+        results_df = pd.DataFrame(results)
+
+        # create_evaluation_report: three passes per score column, then a groupby
+        pd.DataFrame({
+            'Average Score': [results_df[c].mean() for c in SCORES],
+            'Min Score': [results_df[c].min() for c in SCORES],
+            'Max Score': [results_df[c].max() for c in SCORES]
+        })
+        results_df.groupby('Category').agg({c: 'mean' for c in SCORES}).round(2)
+
+        # create_comparison_report: another DataFrame and groupby per model, .loc per category
+        category_averages = results_df.groupby('Category').agg({c: 'mean' for c in SCORES}).round(2)
+        for category in category_averages.index:
+            comparison_data.append({
+                'Model': model_name, 'Category': category,
+                **{c: category_averages.loc[category, c] for c in SCORES}
+            })
+        comparison_data.append({'Model': model_name, 'Category': 'OVERALL', **{c: results_df[c].mean() for c in SCORES}})
+
+    comparison_df = pd.DataFrame(comparison_data)
+    return [comparison_df.pivot(index='Category', columns='Model', values=c) for c in SCORES]
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:10s} {elapsed * 1000:10.1f} ms")
+    return elapsed
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--models", type=int, default=24)
+    parser.add_argument("--categories", type=int, default=10)
+    args = parser.parse_args()
+
+    all_results = synthetic_results(args.questions, args.models, args.categories)
+    print(f"{args.questions} questions x {args.models} models, {args.categories} categories")
+
+    legacy = timed("legacy", lambda: legacy_reports(all_results))
+    engine = timed("engine", lambda: test2.build_reports(all_results))
+    print(f"speedup: {legacy / engine:.1f}x")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,72 @@
+"""Write and load time of a results table as Excel vs Parquet with deduplicated contexts.
+
+    python benchmarks/bench_results_store.py --rows 5000 --contexts 500 --context-chars 4000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import results_store
+
+
+def synthetic_results(rows, contexts, context_chars):
+    rng = np.random.default_rng(0)
+    texts = [f"context {i} " + "lorem ipsum dolor sit amet " * (context_chars // 27) for i in range(contexts)]
+    scores = rng.integers(0, 11, size=(rows, 4))
+    return pd.DataFrame({
+        "Category": rng.choice(["Billing", "Shipping", "Returns", "Account"], size=rows),
+        "Questions": [f"question {i}" for i in range(rows)],
+        "Golden Answers": [f"golden answer {i}" for i in range(rows)],
+        "gpt-4o Answer": [f"model answer {i} " * 20 for i in range(rows)],
+        "Context": [texts[i] for i in rng.integers(0, contexts, size=rows)],
+        "Faithfulness Score": scores[:, 0],
+        "Answer Relevance Score": scores[:, 1],
+        "Context Relevance Score": scores[:, 2],
+        "correctness Score": scores[:, 3],
+        "Overall Score": scores.mean(axis=1),
+        "Evaluation Explanation": ["explanation"] * rows
+    })
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:22s} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    return result
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--contexts", type=int, default=500)
+    parser.add_argument("--context-chars", type=int, default=4000)
+    args = parser.parse_args()
+
+    df = synthetic_results(args.rows, args.contexts, args.context_chars)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        excel = os.path.join(tmp, "results.xlsx")
+        table = os.path.join(tmp, "results.parquet")
+        contexts = os.path.join(tmp, "contexts.parquet")
+
+        timed("excel write", lambda: df.to_excel(excel, index=False, engine="openpyxl"))
+        timed("parquet write", lambda: results_store.write_table(df, table, contexts))
+
+        timed("excel load", lambda: pd.read_excel(excel))
+        timed("parquet load", lambda: results_store.read_table(table, contexts))
+        timed("parquet load (scores)", lambda: results_store.read_table(
+            table, columns=["Category", "Overall Score"]))
+
+        size = os.path.getsize(table) + os.path.getsize(contexts)
+        print(f"sizes: excel {os.path.getsize(excel) / 1e6:.1f} MB, parquet {size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main_cli()
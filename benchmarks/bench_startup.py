@@ -0,0 +1,105 @@
+"""Startup cost of main.py and test2.py, measured with python -X importtime.
+
+Each module is imported in a fresh interpreter, --repeat times. Reports the
+median wall time beyond a bare interpreter start, the module's own imports
+that took longest (cumulative, from the median run) and which of the
+heavy SDKs got loaded at import. Only imports are timed, no client is built
+and nothing is called. With --budget the exit status is 1 when a module's
+median goes over it, so the check can run in CI.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py main test2 providers --repeat 7 --top 15 --budget 1.5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Reported as loaded/not loaded for every module measured
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "tiktoken", "openai", "anthropic", "google.generativeai", "pinecone"]
+
+
+def run(code, importtime=False):
+    """Wall time of `python -c code` and its -X importtime report (stderr)"""
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{code!r} failed:\n{result.stderr[-2000:]}")
+    return elapsed, result.stderr, result.stdout
+
+
+def parse_importtime(report):
+    """[(module, self seconds, cumulative seconds, depth)] from -X importtime output"""
+    rows = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6, depth))
+    return rows
+
+
+def measure(module, repeat):
+    baseline = statistics.median(run("pass")[0] for _ in range(repeat))
+    probe = f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+
+    runs = []
+    for _ in range(repeat):
+        elapsed, report, loaded = run(probe, importtime=True)
+        runs.append((elapsed, report, loaded.split()))
+    runs.sort(key=lambda entry: entry[0])
+    elapsed, report, loaded = runs[len(runs) // 2]
+
+    rows = parse_importtime(report)
+    # -X importtime lists a module after everything it imports: its direct imports are the
+    # depth-1 rows right before it
+    end = next(i for i, row in enumerate(rows) if row[0] == module and row[3] == 0)
+    start = end
+    while start > 0 and rows[start - 1][3] > 0:
+        start -= 1
+    direct = [row for row in rows[start:end] if row[3] == 1]
+    return {
+        "module": module,
+        "median_s": elapsed,
+        "over_interpreter_s": elapsed - baseline,
+        "import_s": rows[end][2],
+        "self_s": rows[end][1],
+        "slowest": sorted(direct, key=lambda row: row[2], reverse=True),
+        "loaded": loaded
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=["main", "test2"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest direct imports to list")
+    parser.add_argument("--budget", type=float, help="fail if a module's median import takes longer (seconds)")
+    args = parser.parse_args()
+
+    over_budget = []
+    for module in args.modules:
+        result = measure(module, args.repeat)
+        print(f"\n{module}: {result['median_s']:.3f}s median start-up "
+              f"({result['over_interpreter_s']:.3f}s over a bare interpreter, import {result['import_s']:.3f}s)")
+        print(f"  heavy modules loaded: {', '.join(result['loaded']) or 'none'}")
+        print(f"  {result['self_s'] * 1000:9.1f} ms  {module} itself")
+        for name, self_s, cumulative_s, _ in result["slowest"][:args.top]:
+            print(f"  {cumulative_s * 1000:9.1f} ms  {name}")
+        if args.budget is not None and result["over_interpreter_s"] > args.budget:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"\nOver the {args.budget}s budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
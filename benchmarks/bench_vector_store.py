@@ -0,0 +1,69 @@
+"""Query latency of the local vector index (exact and approximate), optionally against Pinecone.
+
+    python benchmarks/bench_vector_store.py --vectors 200000 --dim 1536
+    python benchmarks/bench_vector_store.py --pinecone   # also time main.initialize_pinecone()'s index
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vector_store
+
+
+def time_queries(index, queries, top_k=3):
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        index.query(vector=q.tolist(), top_k=top_k, include_metadata=True)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    return np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--pinecone", action="store_true")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = rng.normal(size=(args.queries, args.dim)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = vector_store.LocalIndex(tmp)
+        start = time.perf_counter()
+        for offset in range(0, args.vectors, 1000):
+            count = min(1000, args.vectors - offset)
+            vectors = rng.normal(size=(count, args.dim)).astype(np.float32)
+            index.upsert([(f"chunk-{offset + i}", v, {"text": f"chunk {offset + i}"}) for i, v in enumerate(vectors)])
+        print(f"local upsert: {args.vectors} x {args.dim} in {time.perf_counter() - start:.2f}s")
+
+        vector_store.APPROX_MIN_VECTORS = 0
+        p50, p95 = time_queries(index, queries)
+        print(f"local exact:  p50 {p50:8.3f} ms  p95 {p95:8.3f} ms")
+
+        vector_store.APPROX_MIN_VECTORS = 1
+        start = time.perf_counter()
+        index.query(vector=queries[0].tolist())
+        print(f"local approx: index built in {time.perf_counter() - start:.2f}s")
+        p50, p95 = time_queries(index, queries)
+        print(f"local approx: p50 {p50:8.3f} ms  p95 {p95:8.3f} ms")
+
+    if args.pinecone:
+        import main
+
+        index = main.initialize_pinecone()
+        p50, p95 = time_queries(index, queries)
+        print(f"pinecone:     p50 {p50:8.3f} ms  p95 {p95:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main_cli()
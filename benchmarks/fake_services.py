@@ -0,0 +1,265 @@
+"""Deterministic offline stand-ins for the OpenAI, Anthropic, Gemini and Pinecone clients.
+
+Each fake answers through the same attributes the pipeline calls on the
+real SDK objects (chat.completions.create, embeddings.create,
+messages.create, generate_content, Index.upsert/query/...), after a
+configurable latency. It fails a configurable share of requests with a 503
+and rejects requests over its own requests-per-minute limit with a 429 and
+a retry-after header, so rate_limiter's retry and back-off paths are
+exercised as they would be against the real APIs.
+
+Latency jitter and injected errors are derived from a seed and the request
+content, so the same workload fails the same requests on every run
+(which requests hit a rate limit still depends on timing). The
+latency of every request a service handled is kept in Service.latencies.
+"""
+import hashlib
+import json
+import random
+import re
+import tempfile
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+import embeddings
+import vector_store
+
+JUDGE_FIELDS = ("faithfulness", "answer_relevance", "context_relevance", "correctness")
+
+
+class FakeAPIError(Exception):
+    """An HTTP error in the shape rate_limiter.status_code/retry_after read"""
+
+    def __init__(self, status_code, message, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+class Service:
+    """Latency, error rate and rate limit of one fake API"""
+
+    def __init__(self, name, latency=0.1, jitter=0.2, error_rate=0.0, rpm=None, seed=0):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rpm = rpm
+        self.seed = seed
+
+        self.lock = threading.Lock()
+        self.sent = deque()     # monotonic times of the requests in the last minute
+        self.attempts = {}      # request key -> times seen, so a retry draws a fresh outcome
+        self.latencies = []
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    def rng(self, key):
+        with self.lock:
+            attempt = self.attempts.get(key, 0)
+            self.attempts[key] = attempt + 1
+        digest = hashlib.sha256(f"{self.seed}:{self.name}:{key}:{attempt}".encode("utf-8")).digest()
+        return random.Random(digest)
+
+    def call(self, key, extra_latency=0.0):
+        """Wait out one request for `key`; raises FakeAPIError for rejected or failed ones"""
+        with self.lock:
+            self.requests += 1
+            if self.rpm:
+                now = time.monotonic()
+                while self.sent and now - self.sent[0] >= 60:
+                    self.sent.popleft()
+                if len(self.sent) >= self.rpm:
+                    self.rate_limited += 1
+                    raise FakeAPIError(429, f"{self.name}: rate limit exceeded",
+                                       retry_after=round(60 - (now - self.sent[0]), 3))
+                self.sent.append(now)
+
+        # Drawn only for admitted requests: 429s depend on timing, injected errors must not
+        rng = self.rng(key)
+        latency = self.latency * (1 + rng.uniform(-self.jitter, self.jitter)) + extra_latency
+        time.sleep(max(0.0, latency))
+
+        if rng.random() < self.error_rate:
+            with self.lock:
+                self.errors += 1
+            raise FakeAPIError(503, f"{self.name}: injected server error")
+
+        with self.lock:
+            self.latencies.append(latency)
+
+
+def count_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def fake_answer(prompt, name):
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return f"{name} answer {digest[:12]}: the context covers this question in its first section."
+
+
+def fake_judgement(prompt):
+    """A valid judge response for a single or batched evaluation prompt"""
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+
+    def evaluation():
+        scores = {field: rng.randint(5, 10) for field in JUDGE_FIELDS}
+        return {**scores, "overall_score": sum(scores.values()) / len(scores),
+                "explanation": "Synthetic evaluation from the benchmark judge."}
+
+    if '"evaluations"' in prompt:
+        names = re.findall(r"^\s*### (.+?)\s*$", prompt, re.MULTILINE)
+        return json.dumps({"evaluations": {name: evaluation() for name in names}})
+    return json.dumps(evaluation())
+
+
+def _chunks(text, size=16):
+    return [text[i:i+size] for i in range(0, len(text), size)]
+
+
+class FakeOpenAI:
+    """OpenAI (and OpenAI-compatible) client: chat completions and embeddings.
+
+    Chat prompts with a JSON-only system prompt get judge responses, every
+    other prompt a canned answer.
+    """
+
+    def __init__(self, service, embedding_service=None, name="openai", dim=None):
+        self.service = service
+        self.embedding_service = embedding_service or service
+        self.name = name
+        self.dim = dim
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat))
+        self.embeddings = SimpleNamespace(create=self._embed)
+
+    def _chat(self, messages, model, stream=False, stream_options=None, **params):
+        prompt = "\n".join(message["content"] for message in messages)
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        content = fake_judgement(prompt) if "JSON" in system else fake_answer(prompt, self.name)
+        usage = SimpleNamespace(prompt_tokens=count_tokens(prompt), completion_tokens=count_tokens(content))
+
+        if stream:
+            return self._stream(prompt, content, usage)
+
+        self.service.call(prompt)
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    def _stream(self, prompt, content, usage):
+        self.service.call(prompt)
+        for piece in _chunks(content):
+            delta = SimpleNamespace(content=piece)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        yield SimpleNamespace(choices=[], usage=usage)
+
+    def _embed(self, input, model):
+        texts = [input] if isinstance(input, str) else list(input)
+        tokens = sum(count_tokens(text) for text in texts)
+        self.embedding_service.call(hashlib.sha256("\n".join(texts).encode("utf-8")).hexdigest(),
+                                    extra_latency=embeddings.FAKE_LATENCY_PER_1K_TOKENS * tokens / 1000)
+        data = [SimpleNamespace(index=i, embedding=embeddings.fake_embedding(text, self.dim))
+                for i, text in enumerate(texts)]
+        return SimpleNamespace(data=data, usage=SimpleNamespace(prompt_tokens=tokens, total_tokens=tokens))
+
+
+class FakeAnthropic:
+    """Anthropic client: messages.create and messages.stream"""
+
+    def __init__(self, service, name="anthropic"):
+        self.service = service
+        self.name = name
+        self.messages = SimpleNamespace(create=self._create, stream=self._stream)
+
+    def _response(self, messages, system=None):
+        prompt = "\n".join([system or ""] + [message["content"] for message in messages])
+        content = fake_answer(prompt, self.name)
+        usage = SimpleNamespace(input_tokens=count_tokens(prompt), output_tokens=count_tokens(content))
+        return prompt, SimpleNamespace(content=[SimpleNamespace(text=content)], usage=usage)
+
+    def _create(self, messages, model, system=None, **params):
+        prompt, response = self._response(messages, system)
+        self.service.call(prompt)
+        return response
+
+    def _stream(self, messages, model, system=None, **params):
+        prompt, response = self._response(messages, system)
+        service = self.service
+
+        class Stream:
+            def __enter__(self):
+                service.call(prompt)
+                self.text_stream = iter(_chunks(response.content[0].text))
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def get_final_message(self):
+                return response
+
+        return Stream()
+
+
+class FakeGenerativeModel:
+    """Gemini GenerativeModel: generate_content, streamed or not"""
+
+    def __init__(self, service, name="gemini"):
+        self.service = service
+        self.name = name
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        content = fake_answer(prompt, self.name)
+        metadata = SimpleNamespace(prompt_token_count=count_tokens(prompt), candidates_token_count=count_tokens(content))
+        self.service.call(prompt)
+        if not stream:
+            return SimpleNamespace(text=content, usage_metadata=metadata)
+        return [SimpleNamespace(text=piece, usage_metadata=metadata) for piece in _chunks(content)]
+
+
+class FakeIndex:
+    """Pinecone Index backed by a vector_store.LocalIndex in a temporary directory"""
+
+    def __init__(self, service, path=None):
+        self.service = service
+        self.store = vector_store.LocalIndex(path or tempfile.mkdtemp(prefix="fake-pinecone-"))
+
+    def upsert(self, vectors):
+        self.service.call("upsert:" + ",".join(str(vector[0]) for vector in vectors))
+        return self.store.upsert(vectors)
+
+    def delete(self, ids):
+        self.service.call("delete:" + ",".join(ids))
+        return self.store.delete(ids)
+
+    def query(self, vector, top_k=3, include_metadata=True):
+        self.service.call("query:" + hashlib.sha256(repr(vector[:8]).encode("utf-8")).hexdigest())
+        return self.store.query(vector=vector, top_k=top_k, include_metadata=include_metadata)
+
+    def describe_index_stats(self):
+        return self.store.describe_index_stats()
+
+
+class FakePinecone:
+    """Pinecone control plane: indexes are created ready"""
+
+    def __init__(self, service, root=None):
+        self.service = service
+        self.root = root or tempfile.mkdtemp(prefix="fake-pinecone-")
+        self.indexes = {}
+
+    def list_indexes(self):
+        names = list(self.indexes)
+        return SimpleNamespace(names=lambda: names)
+
+    def create_index(self, name, dimension, metric="cosine", spec=None):
+        self.indexes[name] = FakeIndex(self.service, f"{self.root}/{name}")
+
+    def describe_index(self, name):
+        return SimpleNamespace(status={"ready": True})
+
+    def Index(self, name):
+        return self.indexes[name]
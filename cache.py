@@ -0,0 +1,189 @@
+"""
+Local SQLite caches shared by ingestion, querying and evaluation.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+
+# Model responses (answers in main.py, judge results in test2.py); "" disables the cache
+RESPONSE_CACHE_PATH = "../middleFiles/response_cache.sqlite"
+RESPONSE_CACHE_TTL = 30 * 24 * 3600  # seconds
+RESPONSE_CACHE_MAX_ENTRIES = 100000
+
+# Set RESPONSE_CACHE_BYPASS=1 for a run that ignores cached responses (fresh ones are still stored)
+RESPONSE_CACHE_BYPASS = os.environ.get("RESPONSE_CACHE_BYPASS") == "1"
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def text_hash(text):
+    """Hex sha256 of a text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Embeddings keyed by (model, sha256 of the text), stored as float32 blobs.
+
+    Holds at most max_entries vectors; the least recently used ones are
+    evicted when a write goes over the limit. Safe to share between threads.
+    """
+
+    def __init__(self, path, max_entries=500000):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL,"
+                " hash TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " PRIMARY KEY (model, hash))"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+
+    def get_many(self, model, texts):
+        """Return {index: vector} for the texts that are cached"""
+        hashes = [text_hash(text) for text in texts]
+        found = {}
+
+        with self.lock, self.conn:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                part = list(set(hashes[start:start + 500]))
+                rows = self.conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(part))})",
+                    [model] + part
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                now = time.time()
+                self.conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND hash = ?",
+                    [(now, model, h) for h in found]
+                )
+
+        result = {}
+        for i, h in enumerate(hashes):
+            if h in found:
+                vector = array("f")
+                vector.frombytes(found[h])
+                result[i] = vector.tolist()
+        return result
+
+    def put_many(self, model, texts, vectors):
+        """Store vectors for texts and evict the oldest entries over the limit"""
+        now = time.time()
+        rows = [(model, text_hash(text), array("f", vector).tobytes(), now) for text, vector in zip(texts, vectors)]
+
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            count = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM embeddings WHERE rowid IN"
+                    " (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def request_key(provider, model, params, prompt):
+    """Content address of a model request"""
+    payload = json.dumps([provider, model, params, prompt], sort_keys=True, ensure_ascii=False)
+    return text_hash(payload)
+
+
+class ResponseCache:
+    """Model responses keyed by request_key, expiring after ttl seconds.
+
+    Holds at most max_entries responses, evicting the least recently used.
+    With bypass set, lookups always miss but responses are still stored.
+    """
+
+    def __init__(self, path, ttl=RESPONSE_CACHE_TTL, max_entries=RESPONSE_CACHE_MAX_ENTRIES, bypass=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " provider TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    def get(self, provider, model, params, prompt):
+        """Cached response text, or None"""
+        if self.bypass:
+            return None
+        key = request_key(provider, model, params, prompt)
+        now = time.time()
+
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, provider, model, params, prompt, response):
+        """Store a response, dropping expired and least recently used entries"""
+        key = request_key(provider, model, params, prompt)
+        now = time.time()
+
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider, model, response, now, now)
+            )
+            self.conn.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl,))
+            count = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM responses WHERE key IN"
+                    " (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def response_cache():
+    """The shared response cache, opened on first use (None if disabled)"""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None and RESPONSE_CACHE_PATH:
+            _response_cache = ResponseCache(
+                RESPONSE_CACHE_PATH,
+                RESPONSE_CACHE_TTL,
+                RESPONSE_CACHE_MAX_ENTRIES,
+                RESPONSE_CACHE_BYPASS
+            )
+        return _response_cache
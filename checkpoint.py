@@ -0,0 +1,69 @@
+"""
+Append-only JSONL checkpoint journals for resumable runs.
+
+Every completed unit of work (an answer, an evaluation) is written as one
+line as soon as it finishes. A resumed run loads the journal and skips what
+is already there; the Excel outputs are compacted from the journal at the end.
+"""
+import json
+import os
+import threading
+
+# Set RESUME=1 to continue from the journals of an interrupted run instead of starting over
+RESUME = os.environ.get("RESUME") == "1"
+
+
+def _to_json(value):
+    """json.dumps fallback for numpy/pandas scalars"""
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def read_journal(path):
+    """Return {key: record} with the latest record per key; a torn last line is ignored"""
+    records = {}
+    if not os.path.exists(path):
+        return records
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record["key"]] = record
+    return records
+
+
+class Journal:
+    """Appends completed work records to a JSONL file; safe to share between threads.
+
+    When resuming, `done` holds the records of the previous run; otherwise
+    the file is started afresh.
+    """
+
+    def __init__(self, path, resume=None):
+        self.path = path
+        self.lock = threading.Lock()
+        resume = RESUME if resume is None else resume
+
+        self.done = read_journal(path) if resume else {}
+        self.file = open(path, "a" if resume else "w", encoding="utf-8")
+
+        # Don't glue the first new record onto a line torn by a crash
+        if resume and self.file.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self.file.write("\n")
+
+    def append(self, key, **fields):
+        line = json.dumps({"key": key, **fields}, default=_to_json, ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
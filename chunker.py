@@ -0,0 +1,193 @@
+"""
+Streaming text chunker.
+
+Each read from the file is tokenized exactly once. Tokens that have not been
+fully emitted yet (at most one chunk plus the unread tail of the read) are
+carried over to the next read, so the total work is linear in the file size.
+
+chunk_files spreads many files, and large files cut into shards, over a
+process pool; chunk ids are derived from the file path and shard number so
+they are stable between runs.
+"""
+import hashlib
+import io
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+READ_SIZE = 1024 * 1024
+
+# Text held back while no safe split point has been found (e.g. one huge line)
+MAX_CARRY = 16 * READ_SIZE
+
+# Files larger than this are cut into shards chunked independently
+SHARD_BYTES = 32 * 1024 * 1024
+
+# Files picked up when ingesting a directory
+TEXT_EXTENSIONS = (".txt", ".md")
+
+# Same rule as safe_split, on raw bytes: ASCII letter/digit then whitespace
+_SAFE_BYTES = re.compile(rb"[A-Za-z0-9][ \t\r\n]")
+
+
+def safe_split(text):
+    """Return an index where text can be tokenized as two separate pieces.
+
+    The GPT encodings never merge a letter or digit with the whitespace that
+    follows it, so splitting right before such whitespace gives the same
+    tokens as encoding the whole text. Returns 0 if there is no such point.
+    """
+    for i in range(len(text) - 1, 0, -1):
+        if text[i].isspace() and text[i - 1].isalnum():
+            return i
+    return 0
+
+
+def read_pieces(f, read_size=None):
+    """Yield the file's text in reads cut at safe split points"""
+    read_size = read_size or READ_SIZE
+    carry = ""
+
+    while True:
+        text = f.read(read_size)
+        if not text:
+            break
+        text = carry + text
+
+        split = safe_split(text)
+        if split == 0:
+            if len(text) < MAX_CARRY:
+                carry = text
+                continue
+            split = len(text)
+
+        carry = text[split:]
+        yield text[:split]
+
+    if carry:
+        yield carry
+
+
+def chunk_stream(f, chunk_size=500, overlap=100, prefix="chunk"):
+    """Yield (chunk_id, text, (start_token, end_token)) for overlapping chunks of a text stream"""
+    import tiktoken  # only runs that chunk pay for loading it
+
+    enc = tiktoken.encoding_for_model("gpt-4")
+    step = chunk_size - overlap
+
+    tokens = []   # pending tokens; tokens[0] is token number `base` of the stream
+    base = 0
+    chunk_count = 0
+
+    for piece in read_pieces(f):
+        tokens.extend(enc.encode_ordinary(piece))
+
+        start = 0
+        while len(tokens) - start > chunk_size:
+            end = start + chunk_size
+            yield f"{prefix}-{chunk_count}", enc.decode(tokens[start:end]), (base + start, base + end)
+            chunk_count += 1
+            start += step
+
+        del tokens[:start]
+        base += start
+
+    # The last partial chunk, unless it is entirely overlap already emitted
+    if tokens and (chunk_count == 0 or len(tokens) > overlap):
+        yield f"{prefix}-{chunk_count}", enc.decode(tokens), (base, base + len(tokens))
+
+
+def stream_chunks(file_path, chunk_size=500, overlap=100, prefix="chunk"):
+    """Yield (chunk_id, text, (start_token, end_token)) for overlapping chunks of a file"""
+    with open(file_path, "r", encoding="utf-8") as f:
+        yield from chunk_stream(f, chunk_size, overlap, prefix)
+
+
+def list_text_files(dir_path):
+    """Sorted paths of the text files under dir_path"""
+    paths = []
+    for root, dirs, files in os.walk(dir_path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in files:
+            if name.lower().endswith(TEXT_EXTENSIONS) and not name.startswith("."):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def chunk_prefix(path, root=None):
+    """ASCII id prefix for a file, derived from its path relative to root.
+
+    The readable part replaces every other character with "_", so paths that
+    differ only there (or non-Latin names) would collide: a short hash of the
+    relative path keeps the prefixes of different files apart.
+    """
+    rel_path = (os.path.relpath(path, root) if root else os.path.basename(path)).replace(os.sep, "/")
+    digest = hashlib.sha1(rel_path.encode("utf-8")).hexdigest()[:8]
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", rel_path) + "-" + digest
+
+
+def file_shards(path, shard_bytes=None):
+    """Split a file into (start, end) byte ranges that end at safe split points"""
+    shard_bytes = shard_bytes or SHARD_BYTES
+    size = os.path.getsize(path)
+    shards = []
+    start = 0
+
+    with open(path, "rb") as f:
+        while size - start > shard_bytes:
+            # Look for the first safe point after the nominal cut
+            cut = None
+            position = start + shard_bytes
+            while cut is None and position < size:
+                f.seek(position)
+                window = f.read(READ_SIZE + 1)
+                match = _SAFE_BYTES.search(window)
+                if match:
+                    cut = position + match.start() + 1
+                position += READ_SIZE
+
+            if cut is None:
+                break
+            shards.append((start, cut))
+            start = cut
+
+    shards.append((start, size))
+    return shards
+
+
+def _chunk_shard(job):
+    """Process-pool worker: chunk one byte range of a file"""
+    path, prefix, start, end, chunk_size, overlap = job
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    text = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8")
+    return [
+        (path, chunk_id, chunk, offsets)
+        for chunk_id, chunk, offsets in chunk_stream(text, chunk_size, overlap, prefix)
+    ]
+
+
+def chunk_files(paths, root=None, chunk_size=500, overlap=100, workers=None):
+    """Chunk files on a process pool; yields (path, chunk_id, text, offsets) in file order.
+
+    Token offsets are relative to the shard the chunk came from. At most
+    twice as many shards as workers are held in memory at once.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = []
+    for path in paths:
+        prefix = chunk_prefix(path, root)
+        for shard, (start, end) in enumerate(file_shards(path)):
+            jobs.append((path, f"{prefix}#{shard}", start, end, chunk_size, overlap))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for job in jobs:
+            in_flight.append(pool.submit(_chunk_shard, job))
+            if len(in_flight) >= 2 * workers:
+                yield from in_flight.popleft().result()
+
+        while in_flight:
+            yield from in_flight.popleft().result()
@@ -0,0 +1,159 @@
+"""
+Batched embedding requests.
+
+Texts are grouped into batches bounded by a token budget and an item count,
+several batches are sent concurrently, and vectors are handed back in input
+order together with the key they were submitted with. Texts already in the
+on-disk embedding cache are not sent at all.
+"""
+import hashlib
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+import rate_limiter
+from cache import EmbeddingCache
+
+EMBED_MODEL = "text-embedding-3-small"
+
+# Per-request limits (the API allows 300k tokens and 2048 inputs per request)
+BATCH_MAX_TOKENS = 250000
+BATCH_MAX_ITEMS = 512
+
+# Batch requests in flight at once
+BATCH_WORKERS = 4
+
+# On-disk cache shared by ingestion and querying ("" disables it)
+CACHE_PATH = "../middleFiles/embedding_cache.sqlite"
+CACHE_MAX_ENTRIES = 500000
+
+# Counters for the current process
+stats = {"requests": 0, "cache_hits": 0, "cache_misses": 0}
+
+# Stub backend: deterministic vectors after a simulated request latency
+FAKE_EMBEDDINGS = False
+FAKE_DIM = 1536
+FAKE_LATENCY = 0.2                 # seconds per request
+FAKE_LATENCY_PER_1K_TOKENS = 0.002  # extra seconds per 1000 tokens in the request
+
+
+_cache = None
+_lock = threading.Lock()
+
+
+def get_cache():
+    """The shared embedding cache, opened on first use (None if disabled)"""
+    global _cache
+    with _lock:
+        if _cache is None and CACHE_PATH:
+            _cache = EmbeddingCache(CACHE_PATH, CACHE_MAX_ENTRIES)
+        return _cache
+
+
+def estimate_tokens(text):
+    """Upper bound on the token count of text (every token is at least one byte)"""
+    return len(text.encode("utf-8"))
+
+
+def make_batches(items, max_tokens=None, max_items=None):
+    """Group (key, text) pairs into lists that fit the per-request budget"""
+    max_tokens = max_tokens or BATCH_MAX_TOKENS
+    max_items = max_items or BATCH_MAX_ITEMS
+
+    batch = []
+    batch_tokens = 0
+    for key, text in items:
+        tokens = estimate_tokens(text)
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_items):
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append((key, text))
+        batch_tokens += tokens
+
+    if batch:
+        yield batch
+
+
+def fake_embedding(text, dim=None):
+    """Deterministic unit vector derived from the text hash"""
+    seed = hashlib.sha256(text.encode("utf-8")).digest()
+    rng = random.Random(seed)
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dim or FAKE_DIM)]
+    norm = sum(v * v for v in vector) ** 0.5
+    return [v / norm for v in vector]
+
+
+def embed_request(client, texts, model=EMBED_MODEL):
+    """Embed a list of texts with a single API request"""
+    with _lock:
+        stats["requests"] += 1
+
+    if FAKE_EMBEDDINGS:
+        with metrics.timed("embedding"):
+            tokens = sum(estimate_tokens(text) for text in texts)
+            time.sleep(FAKE_LATENCY + FAKE_LATENCY_PER_1K_TOKENS * tokens / 1000)
+            return [fake_embedding(text) for text in texts]
+
+    tokens = sum(rate_limiter.estimate_tokens(text) for text in texts)
+    response = rate_limiter.call_with_retry("embeddings", client.embeddings.create, input=texts, model=model,
+                                            tokens=tokens, stage="embedding")
+    metrics.add_usage("embeddings", model, *metrics.usage_of(response))
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+def cache_model(model):
+    """Model name the cache files vectors under; fake vectors never pass for the real model's"""
+    return f"fake:{FAKE_DIM}" if FAKE_EMBEDDINGS else model
+
+
+def embed_batch(client, texts, model=EMBED_MODEL):
+    """Embed a batch, requesting only the texts missing from the cache"""
+    cache = get_cache()
+    if cache is None:
+        return embed_request(client, texts, model)
+
+    vectors = cache.get_many(cache_model(model), texts)
+    missing = [i for i in range(len(texts)) if i not in vectors]
+    with _lock:
+        stats["cache_hits"] += len(texts) - len(missing)
+        stats["cache_misses"] += len(missing)
+
+    if missing:
+        missing_texts = [texts[i] for i in missing]
+        fetched = embed_request(client, missing_texts, model)
+        cache.put_many(cache_model(model), missing_texts, fetched)
+        vectors.update(zip(missing, fetched))
+
+    return [vectors[i] for i in range(len(texts))]
+
+
+def embed_items(client, items, model=EMBED_MODEL):
+    """Embed (key, text) pairs in batches; yields (key, text, vector) in input order.
+
+    items may be a lazy iterator: at most BATCH_WORKERS batches are waited on
+    beyond the ones being sent, so memory stays bounded on large corpora.
+    """
+    def drain(entry):
+        batch, future = entry
+        for (key, text), vector in zip(batch, future.result()):
+            yield key, text, vector
+
+    with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+        in_flight = deque()
+        for batch in make_batches(items):
+            texts = [text for _, text in batch]
+            in_flight.append((batch, pool.submit(embed_batch, client, texts, model)))
+            if len(in_flight) > BATCH_WORKERS:
+                yield from drain(in_flight.popleft())
+
+        while in_flight:
+            yield from drain(in_flight.popleft())
+
+
+def embed_texts(client, texts, model=EMBED_MODEL):
+    """Embed a list of texts; returns vectors in the same order"""
+    return [vector for _, _, vector in embed_items(client, enumerate(texts), model)]
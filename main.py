@@ -1,13 +1,22 @@
-import pinecone # embedding 
-from pinecone import ServerlessSpec
-import tiktoken
 import pandas as pd
-from openai import OpenAI
 from datetime import datetime
-import anthropic
-import google.generativeai as genai
 import time
-import test2
+import hashlib
+import json
+import itertools
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import cache
+import checkpoint
+import chunker
+import embeddings
+import metrics
+import providers
+import rate_limiter
+import results_store
+import vector_store
 
 # --------------------------
 # Configuration
@@ -17,34 +26,52 @@ OPENAI_API_KEY = ""
 INDEX_NAME = ""
 EMBED_DIM = ""
 FILE_PATH = ""
+INPUT_DIR = ""  # e.g. "../uploadFiles"; when set, its text files are ingested instead of FILE_PATH
+INGEST_WORKERS = None  # chunking processes for INPUT_DIR (default: one per core)
+INGEST_MANIFEST = "../middleFiles/ingest_manifest.json"  # file/chunk hashes of what is in the index
+INDEX_READY_TIMEOUT = 300  # seconds to wait for a new index to become ready
+VECTOR_BACKEND = "pinecone"  # or "local": in-process index under LOCAL_INDEX_DIR, no Pinecone needed
+LOCAL_INDEX_DIR = "../middleFiles/local_index"
 INPUT_EXCEL = ""
 OUTPUT_EXCEL = ""
-# Initialize clients
-client_GPT = OpenAI(api_key=OPENAI_API_KEY)
-pc = pinecone.Pinecone(api_key=PINECONE_API_KEY)
-client_DEEP_SEEK = OpenAI(
-    api_key="",
-    base_url="https://api.deepseek.com"
-)
+RESULTS_TABLE = "../middleFiles/results_with_all_contexts.parquet"  # primary results output, read by test2
+CONTEXTS_TABLE = "../middleFiles/contexts.parquet"  # each distinct context once, referenced by id from RESULTS_TABLE
+ANSWER_JOURNAL = "../middleFiles/answers_journal.jsonl"  # checkpoint of contexts and answers (RESUME=1 continues it)
+PIPELINE = False  # answer and evaluate in one pass, streaming answers straight into test2's judge
+EXPORT_EXCEL = True  # also export the results as OUTPUT_EXCEL
+# Clients are built on first use (openai_client(), pinecone_client()), so a run that
+# never reaches Pinecone or the embeddings API does not import or configure those SDKs
+client_GPT = None
+pc = None
+_clients_lock = threading.Lock()
+# The answering models' clients, keys and limits are configured in providers.json
 
 
-ANTHROPIC_API_KEY = ""
-client_CLADE = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+# Models answered for every question (also the answer column names), from providers.json
+LLM_MODELS = providers.enabled_models()
 
+# Provider model id, request parameters and system prompt behind each model (the response cache key)
+MODEL_SETTINGS = providers.model_settings()
 
-GOOGLE_API_KEY = ""
-genai.configure(api_key=GOOGLE_API_KEY)
+# Max in-flight calls per provider; each provider gets its own worker pool
+PROVIDER_CONCURRENCY = providers.model_concurrency()
 
+# Questions whose context is retrieved in parallel
+QUESTION_WORKERS = 8
 
+# Offline mode: answer with canned text after FAKE_LATENCY seconds instead of calling the APIs
+FAKE_PROVIDERS = False
+FAKE_LATENCY = 1.0
 
-XAI_API_KEY = ""
-
-# Initialize Grok client
-client_grok = OpenAI(
-    api_key=XAI_API_KEY,
-    base_url="https://api.x.ai/v1"  # Grok API endpoint
-)
+# Stream answers as they are generated: prints "[partial <model> #<call>] ..." lines for the
+# python-runner UI and records time to first token, tokens/s and latency per call
+STREAM_RESPONSES = False
+STREAM_PRINT_INTERVAL = 0.5  # seconds between partial-output lines of one call
+STREAM_PREVIEW_CHARS = 200   # tail of the answer shown in a partial-output line
+STREAM_METRICS_TABLE = "../middleFiles/stream_metrics.parquet"
 
+# Stage timings, token usage and estimated cost of the run (see metrics.py)
+RUN_REPORT = "../outputFiles/main_run_report.json"
 
 
 # Helper function for consistent logging
@@ -56,172 +83,231 @@ def log_message(message):
 # Core Functions (with logging)
 # --------------------------
 
+def openai_client():
+    """The OpenAI client used for embeddings (None with embeddings.FAKE_EMBEDDINGS, which needs none)"""
+    global client_GPT
+    if embeddings.FAKE_EMBEDDINGS and client_GPT is None:
+        return None
+    with _clients_lock:
+        if client_GPT is None:
+            from openai import OpenAI
+            client_GPT = OpenAI(api_key=OPENAI_API_KEY)
+        return client_GPT
+
+def pinecone_client():
+    global pc
+    with _clients_lock:
+        if pc is None:
+            import pinecone
+            pc = pinecone.Pinecone(api_key=PINECONE_API_KEY)
+        return pc
+
 def initialize_pinecone():
-    """Initialize Pinecone connection and index"""
-    log_message("Starting Pinecone initialization...")
+    """Connect to the Pinecone index, creating it only if it does not exist"""
+    from pinecone import ServerlessSpec
     
-    if INDEX_NAME in pc.list_indexes().names():
-        log_message(f"Deleting existing index: {INDEX_NAME}")
-        pc.delete_index(INDEX_NAME)
+    log_message("Starting Pinecone initialization...")
+    pc = pinecone_client()
     
-    log_message(f"Creating new index: {INDEX_NAME}")
-    pc.create_index(
-        name=INDEX_NAME,
-        dimension=EMBED_DIM,
-        metric="cosine",
-        spec=ServerlessSpec(cloud="aws", region="us-east-1")
-    )
+    if INDEX_NAME not in pc.list_indexes().names():
+        log_message(f"Creating new index: {INDEX_NAME}")
+        pc.create_index(
+            name=INDEX_NAME,
+            dimension=EMBED_DIM,
+            metric="cosine",
+            spec=ServerlessSpec(cloud="aws", region="us-east-1")
+        )
+    else:
+        log_message(f"Using existing index: {INDEX_NAME}")
     
-    log_message("Waiting 60 seconds for index initialization...")
-    time.sleep(60)
+    wait_for_index(INDEX_NAME)
     
     log_message("Pinecone initialization completed")
     return pc.Index(INDEX_NAME)
 
+def open_index():
+    """Open the vector store selected by VECTOR_BACKEND"""
+    if VECTOR_BACKEND == "local":
+        log_message(f"Opening local vector index: {LOCAL_INDEX_DIR}")
+        return vector_store.LocalIndex(LOCAL_INDEX_DIR)
+    return initialize_pinecone()
+
+def index_key():
+    """Identifies the vector store an ingest manifest was built for"""
+    if VECTOR_BACKEND == "local":
+        return f"local:{LOCAL_INDEX_DIR}"
+    return INDEX_NAME
+
+def wait_for_index(name, timeout=None):
+    """Poll the index status until it is ready"""
+    deadline = time.time() + (timeout or INDEX_READY_TIMEOUT)
+    delay = 1
+    
+    while not pinecone_client().describe_index(name).status["ready"]:
+        if time.time() > deadline:
+            raise TimeoutError(f"Index {name} not ready after {timeout or INDEX_READY_TIMEOUT} seconds")
+        log_message(f"Waiting for index {name} to become ready...")
+        time.sleep(delay)
+        delay = min(delay * 2, 10)
+
 def chunk_text(file_path, chunk_size=500, overlap=100):
     """Generate text chunks with overlap"""
     log_message(f"Starting chunking process for file: {file_path}")
     
-    enc = tiktoken.encoding_for_model("gpt-4")
-    buffer = ""
     chunk_count = 0
     
-    with open(file_path, "r", encoding="utf-8") as f:
-        while True:
-            chunk = f.read(1024*1024)
-            if not chunk:
-                break
-            buffer += chunk
-            tokens = enc.encode(buffer)
-            
-            while len(tokens) > chunk_size:
-                yield enc.decode(tokens[:chunk_size])
-                chunk_count += 1
-                tokens = tokens[chunk_size - overlap:]
-                buffer = enc.decode(tokens)
+    for _, text, _ in chunker.stream_chunks(file_path, chunk_size, overlap):
+        chunk_count += 1
+        yield text
+    
+    log_message(f"Chunking completed. Total chunks: {chunk_count}")
+
+def chunk_directory(dir_path, paths=None, chunk_size=500, overlap=100):
+    """Generate (path, chunk_id, text, offsets) for the text files in a directory"""
+    if paths is None:
+        paths = chunker.list_text_files(dir_path)
+    log_message(f"Starting parallel chunking of {len(paths)} files in: {dir_path}")
+    
+    chunk_count = 0
+    
+    for chunk in chunker.chunk_files(paths, dir_path, chunk_size, overlap, INGEST_WORKERS):
+        chunk_count += 1
+        yield chunk
     
     log_message(f"Chunking completed. Total chunks: {chunk_count}")
 
+def file_sha256(path):
+    """Hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024*1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def text_sha256(text):
+    """Hex digest of a chunk's text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def load_manifest():
+    """Load the ingest manifest, or an empty one if missing or built for another index"""
+    empty = {"index": index_key(), "files": {}}
+    if not os.path.exists(INGEST_MANIFEST):
+        return empty
+    
+    with open(INGEST_MANIFEST, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    
+    if manifest.get("index") != index_key():
+        log_message("Ingest manifest belongs to another index, ignoring it")
+        return empty
+    return manifest
+
+def save_manifest(manifest):
+    """Write the ingest manifest atomically"""
+    tmp_path = INGEST_MANIFEST + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, INGEST_MANIFEST)
+
+def source_files():
+    """Paths of the documents to ingest"""
+    if INPUT_DIR:
+        return chunker.list_text_files(INPUT_DIR)
+    return [FILE_PATH]
+
+def source_chunks(paths):
+    """Generate (path, chunk_id, text) for the given source files"""
+    if INPUT_DIR:
+        for path, chunk_id, chunk, _ in chunk_directory(INPUT_DIR, paths):
+            yield path, chunk_id, chunk
+    else:
+        for path in paths:
+            for i, chunk in enumerate(chunk_text(path)):
+                yield path, f"chunk-{i}", chunk
+
 def process_documents(index):
-    """Ingest documents into Pinecone"""
+    """Bring the Pinecone index in line with the source documents.
+
+    Only chunks whose text changed since the last run (according to the
+    ingest manifest) are embedded and upserted; chunks that disappeared are
+    deleted. Nothing is chunked or embedded if no source file changed.
+    """
     log_message("Starting document processing...")
     
+    manifest = load_manifest()
+    if manifest["files"] and index.describe_index_stats()["total_vector_count"] == 0:
+        log_message("Index is empty, ignoring ingest manifest")
+        manifest["files"] = {}
+    
+    old_files = manifest["files"]
+    paths = source_files()
+    file_hashes = {path: file_sha256(path) for path in paths}
+    changed = [path for path in paths if old_files.get(path, {}).get("sha256") != file_hashes[path]]
+    removed = [path for path in old_files if path not in file_hashes]
+    
+    if not changed and not removed:
+        log_message("Source documents unchanged, skipping ingestion")
+        return
+    
+    log_message(f"{len(changed)} new or changed files, {len(removed)} removed files")
+    
+    new_chunks = {path: {} for path in changed}
+    
+    def pending_chunks():
+        """Chunks of changed files whose text is not already in the index"""
+        for path, chunk_id, chunk in metrics.timed_iter("chunking", source_chunks(changed)):
+            chunk_hash = text_sha256(chunk)
+            new_chunks[path][chunk_id] = chunk_hash
+            if old_files.get(path, {}).get("chunks", {}).get(chunk_id) != chunk_hash:
+                yield chunk_id, chunk
+    
     batch = []
     total_chunks = 0
     
-    for i, chunk in enumerate(chunk_text(FILE_PATH)):
-        log_message(f"Processing chunk {i+1}...")
-        
-        emb = client_GPT.embeddings.create(
-            input=chunk,
-            model="text-embedding-3-small"
-        ).data[0].embedding
-        
-        batch.append((f"chunk-{i}", emb, {"text": chunk}))
+    for chunk_id, chunk, emb in embeddings.embed_items(openai_client(), pending_chunks()):
+        batch.append((chunk_id, emb, {"text": chunk}))
         
         if len(batch) >= 100:
             log_message(f"Upserting batch of {len(batch)} chunks...")
-            index.upsert(vectors=batch)
+            rate_limiter.call_with_retry("pinecone", index.upsert, vectors=batch, stage="upsert")
             total_chunks += len(batch)
             batch = []
             log_message(f"Total chunks processed: {total_chunks}")
-            time.sleep(1)
     
     if batch:
         log_message(f"Upserting final batch of {len(batch)} chunks...")
-        index.upsert(vectors=batch)
+        rate_limiter.call_with_retry("pinecone", index.upsert, vectors=batch, stage="upsert")
         total_chunks += len(batch)
     
-    log_message(f"Document processing completed. Total chunks: {total_chunks}")
-
-
-
-def chatGPT_API(prompt: str)-> str:
-    response = client_GPT.chat.completions.create(
-    model="gpt-4",
-    messages=[
-        {"role": "system", "content": "You are a helpful assistant."},
-        {"role": "user", "content": prompt}
-    ],
-    temperature=0.1
-    )
-    result = response.choices[0].message.content
-    return result
-
-def deepSeek_API(prompt: str)-> str:
-        response = client_DEEP_SEEK.chat.completions.create(
-            model="deepseek-reasoner",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            stream=False
-        )
-        result = response.choices[0].message.content
-        return result
-
-def claude_API(prompt: str) -> str:
-    """Get answer from Claude 3.7 through API"""
-    try:
-        log_message("Starting Claude API call...")
-        
-        response = client_CLADE.messages.create(
-            model="claude-3-opus-20240229",
-            max_tokens=1000,
-            temperature=0.3,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-
-        log_message("Claude API call successful")
-        result = response.content[0].text
-        
-    except Exception as e:
-        log_message(f"Claude API error: {str(e)}")
-        result = f"Error: {str(e)}"
-    return result
-
-def gemini_API(prompt: str) -> str:
-    """Get answer from Gemini 2.5 Pro through API"""
-    time.sleep(5)  # Add this between API calls
-    try:
-        log_message("Starting Gemini API call...")
-        
-        model = genai.GenerativeModel('gemini-2.5-flash-preview-05-20')
-        response = model.generate_content(prompt)
-        
-        log_message("Gemini API call successful")
-        return response.text
-        
-    except Exception as e:
-        log_message(f"Gemini API error: {str(e)}")
-        return f"Error: {str(e)}"
-
-def grok_API(prompt: str) -> str:
-    """Get answer from Grok through API"""
-    try:
-        log_message("Starting Grok API call...")
-        
-        response = client_grok.chat.completions.create(
-            model="grok-3",
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=1000
-        )
-        
-        log_message("Grok API call successful")
-        result = response.choices[0].message.content
-        
-    except Exception as e:
-        log_message(f"Grok API error: {str(e)}")
-        result = f"Error: {str(e)}"
+    # Delete vectors of chunks that no longer exist. An id can move between paths (single-file
+    # ids are positional, so a renamed FILE_PATH reuses them): only ids no file still has are gone.
+    live_ids = set()
+    for path in paths:
+        live_ids.update(new_chunks[path] if path in new_chunks else old_files.get(path, {}).get("chunks", {}))
+    stale_ids = []
+    for path in changed + removed:
+        old_ids = old_files.get(path, {}).get("chunks", {})
+        stale_ids.extend(chunk_id for chunk_id in old_ids if chunk_id not in live_ids)
+    stale_ids = list(dict.fromkeys(stale_ids))
+    
+    for start in range(0, len(stale_ids), 1000):
+        log_message(f"Deleting {len(stale_ids[start:start+1000])} stale chunks...")
+        rate_limiter.call_with_retry("pinecone", index.delete, ids=stale_ids[start:start+1000], stage="delete")
+    
+    for path in removed:
+        del old_files[path]
+    for path in changed:
+        old_files[path] = {"sha256": file_hashes[path], "chunks": new_chunks[path]}
+    save_manifest(manifest)
+    
+    log_message(f"Document processing completed. Upserted: {total_chunks}, deleted: {len(stale_ids)}")
 
-    return result
 
 
+def fake_API(prompt: str, model_name: str) -> str:
+    """Offline stand-in for a provider call, used to benchmark the answer engine"""
+    time.sleep(FAKE_LATENCY)
+    return f"[{model_name}] fake answer for a {len(prompt)}-character prompt"
 
 
 def get_llm_answer(question, context, model_name):
@@ -233,46 +319,143 @@ def get_llm_answer(question, context, model_name):
     
     Question: {question}"""#    If unsure, say "I don't know".
     
+    if FAKE_PROVIDERS:
+        with metrics.timed("llm", model_name):
+            result = fake_API(prompt, model_name)
+        log_message(f"{model_name} response received")
+        return result
+    
+    responses = cache.response_cache()
+    settings = MODEL_SETTINGS.get(model_name, {})
+    if responses:
+        cached = responses.get(model_name, settings.get("model", model_name), settings, prompt)
+        if cached is not None:
+            log_message(f"{model_name} response loaded from cache")
+            return cached
+    
+    result = call_model(prompt, model_name)
+    if responses and result is not None and not result.startswith("Error:"):
+        responses.put(model_name, settings.get("model", model_name), settings, prompt, result)
+    return result
+
+
+_stream_ids = itertools.count(1)
+
+
+def stream_answer(provider, prompt, call_id):
+    """Stream one answer, printing its progress for the python-runner UI
+
+    Retries of a call reuse its call_id, so they update the same line.
+    """
+    last_print = 0.0
+    
+    def on_partial(text):
+        nonlocal last_print
+        now = time.monotonic()
+        if now - last_print >= STREAM_PRINT_INTERVAL:
+            last_print = now
+            preview = " ".join(text.split())[-STREAM_PREVIEW_CHARS:]
+            print(f"[partial {provider.name} #{call_id}] {preview}", flush=True)
+    
+    text, timing = provider.generate_streaming(prompt, on_partial)
+    ttft = f"{timing['ttft']:.2f}s" if timing["ttft"] is not None else "n/a"
+    rate = f"{timing['tokens_per_s']:.1f} tok/s" if timing["tokens_per_s"] is not None else "n/a"
+    print(f"[done {provider.name} #{call_id}] first token {ttft}, {rate}, total {timing['total']:.2f}s", flush=True)
+    return text
+
+
+def call_model(prompt, model_name):
+    """Send a prompt to one of the supported LLMs, within its rate limits and with retries"""
+    tokens = rate_limiter.estimate_tokens(prompt, MODEL_SETTINGS.get(model_name, {}).get("max_tokens", 1000))
+    call_id = next(_stream_ids) if STREAM_RESPONSES else None
     try:
-        if model_name == "gpt-4o":
-            result = chatGPT_API(prompt)
-            log_message(f"{model_name} response received")
-            return result
-        elif model_name == "DeepSeek Chat":
-            result = deepSeek_API(prompt)
-            log_message(f"{model_name} response received")
-            return result   
-        elif model_name == "Claude3.7":
-            result = claude_API(prompt)
-            log_message(f"{model_name} response received")
-            return result  
-        elif model_name == "Gemini2.5Pro":
-            result = gemini_API(prompt)
-            log_message(f"{model_name} response received")
-            return result  
-        elif model_name == "Grok3":
-            result = grok_API(prompt)
-            log_message(f"{model_name} response received")
-            return result  
+        provider = providers.get_provider(model_name)
+        if STREAM_RESPONSES:
+            result = rate_limiter.call_with_retry(model_name, stream_answer, provider, prompt, call_id,
+                                                  tokens=tokens, stage="llm", label=model_name)
+        else:
+            result = rate_limiter.call_with_retry(model_name, provider.generate, prompt,
+                                                  tokens=tokens, stage="llm", label=model_name)
+        log_message(f"{model_name} response received")
+        return result
             
     except Exception as e:
         log_message(f"Error in {model_name}: {str(e)}")
+        if call_id is not None:
+            # Close the call's streaming line in the UI
+            print(f"[done {model_name} #{call_id}] failed: {' '.join(str(e).split())}", flush=True)
         return f"Error: {str(e)}"
 
 
-def process_questions(index):
-    """Process Excel questions and generate answers"""
-    log_message("Starting question processing...")
+def answer_questions(items, llm_models=None, done=None, on_answer=None):
+    """Answer (question, context) pairs with every model concurrently.
 
-    llm_models = [
-        "gpt-4o",
-        "DeepSeek Chat", 
-        "Grok3",
-        "Claude3.7",
-        "Gemini2.5Pro"
-    ]
+    All model calls for all questions are submitted up front; each provider
+    runs them on its own pool of PROVIDER_CONCURRENCY workers. Yields one
+    {model: answer} dict per item, in input order.
 
-    results = []
+    done maps (item number, model) to answers that are already known (e.g.
+    from a checkpoint) and are not requested again. on_answer(item number,
+    model, answer) is called from the worker thread as each new answer arrives.
+    """
+    llm_models = llm_models or LLM_MODELS
+    done = done or {}
+    pools = {
+        model: ThreadPoolExecutor(
+            max_workers=PROVIDER_CONCURRENCY.get(model, 1),
+            thread_name_prefix=model
+        )
+        for model in llm_models
+    }
+
+    def answer(i, question, context, model):
+        result = get_llm_answer(question, context, model)
+        if on_answer:
+            on_answer(i, model, result)
+        return result
+
+    def known(result):
+        future = Future()
+        future.set_result(result)
+        return future
+
+    try:
+        pending = [
+            {
+                model: known(done[i, model]) if (i, model) in done
+                else pools[model].submit(answer, i, question, context, model)
+                for model in llm_models
+            }
+            for i, (question, context) in enumerate(items)
+        ]
+        for futures in pending:
+            yield {model: future.result() for model, future in futures.items()}
+    finally:
+        for pool in pools.values():
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def retrieve_context(index, query_emb):
+    """Return the text of the top matches for a question embedding"""
+    matches = rate_limiter.call_with_retry(
+        "pinecone",
+        index.query,
+        vector=query_emb,
+        top_k=3,
+        include_metadata=True,
+        stage="retrieval"
+    ).matches
+
+    return "\n".join([m.metadata["text"] for m in matches])
+
+
+def question_key(idx, question):
+    """Checkpoint key of an input row: its position plus a hash of the question"""
+    return f"{idx}:{cache.text_hash(str(question))[:16]}"
+
+
+def load_questions():
+    """Read INPUT_EXCEL; returns the questions DataFrame and a checkpoint key per row"""
     # Read input with column validation
     try:
         df = pd.read_excel(
@@ -283,59 +466,164 @@ def process_questions(index):
     except KeyError as e:
         raise ValueError(f"Missing required column in input Excel: {e}")
 
-    # Initialize output structure
-        
+    keys = [question_key(idx, question) for idx, question in zip(df.index, df["Questions"])]
+    return df, keys
+
 
+def build_record(row, context, answers, llm_models):
+    """Output row for one question, with the columns of OUTPUT_EXCEL"""
+    # Initialize output structure
     required_columns = ["Category", "Questions", "Golden Answers"]
     answer_columns = [f"{model}" for model in llm_models]
     columns = required_columns + answer_columns
-    
-    log_message(f"Processing {len(df)} questions...")
-    for idx, row in df.iterrows():
-        log_message(f"Processing question {idx+1}/{len(df)}")
-        
-        # Initialize record with all columns
-        record = {col: "" for col in columns}
-        
-        # Copy base data
-        record.update({
-            "Category": row["Category"],
-            "Questions": row["Questions"],
-            "Golden Answers": row["Golden Answers"]
-        })
-        
-        # Get context
-        log_message("Generating question embedding...")
-        query_emb = client_GPT.embeddings.create(
-            input=row["Questions"],
-            model="text-embedding-3-small"
-        ).data[0].embedding
-        
-        log_message("Querying Pinecone index...")
-        matches = index.query(
-            vector=query_emb,
-            top_k=3,
-            include_metadata=True
-        ).matches
-        
-        context = "\n".join([m.metadata["text"] for m in matches])
-        record["Context"] = context  # Add this line
 
-        # Get answers from all models
+    # Initialize record with all columns
+    record = {col: "" for col in columns}
+
+    # Copy base data
+    record.update({
+        "Category": row["Category"],
+        "Questions": row["Questions"],
+        "Golden Answers": row["Golden Answers"]
+    })
+    record["Context"] = context
+    for model in llm_models:
+        record[model] = answers.get(model, "")
+
+    return record
+
+
+def answer_records(index, df, keys):
+    """Answer every question with every model; yields each question's output record in input order.
+
+    Contexts and answers are written to ANSWER_JOURNAL as they complete;
+    with RESUME=1 a rerun skips everything already journaled (failed
+    answers are retried).
+    """
+    llm_models = LLM_MODELS
+    questions = df["Questions"].tolist()
+
+    journal = checkpoint.Journal(ANSWER_JOURNAL)
+    if journal.done:
+        log_message(f"Resuming from {ANSWER_JOURNAL} ({len(journal.done)} journaled records)")
+
+    contexts = [journal.done.get(f"context:{key}", {}).get("context") for key in keys]
+    missing = [i for i, context in enumerate(contexts) if context is None]
+
+    if missing:
+        log_message(f"Generating embeddings for {len(missing)} questions...")
+        query_embs = embeddings.embed_texts(openai_client(), [questions[i] for i in missing])
+
+        log_message(f"Retrieving context for {len(missing)} questions...")
+        with ThreadPoolExecutor(max_workers=QUESTION_WORKERS) as pool:
+            found = list(pool.map(lambda query_emb: retrieve_context(index, query_emb), query_embs))
+
+        for i, context in zip(missing, found):
+            contexts[i] = context
+            journal.append(f"context:{keys[i]}", context=context)
+
+    done = {}
+    for i, key in enumerate(keys):
         for model in llm_models:
-            log_message(f"Processing {model}...")
-            answer = get_llm_answer(row["Questions"], context, model)
-            record[f"{model}"] = answer
-        
-        results.append(record)
-    
+            record = journal.done.get(f"answer:{key}:{model}")
+            if record and not record["error"]:
+                done[i, model] = record["answer"]
+
+    def record_answer(i, model, answer):
+        failed = answer is None or answer.startswith("Error:")
+        journal.append(f"answer:{keys[i]}:{model}", answer=answer, error=failed)
+
+    log_message(f"Dispatching {len(df) * len(llm_models) - len(done)} model calls...")
+    answers = answer_questions(zip(questions, contexts), llm_models, done, record_answer)
+
+    try:
+        for (i, (idx, row)), context, model_answers in zip(enumerate(df.iterrows()), contexts, answers):
+            log_message(f"Question {i+1}/{len(df)} answered")
+            yield build_record(row, context, model_answers, llm_models)
+    finally:
+        journal.close()
+
+
+def process_questions(index):
+    """Process Excel questions and generate answers"""
+    log_message("Starting question processing...")
+
+    df, keys = load_questions()
+    for _ in answer_records(index, df, keys):
+        pass
+
+    compact_answers(df, keys, LLM_MODELS)
+
+
+def compact_answers(df, keys, llm_models):
+    """Build RESULTS_TABLE (and the OUTPUT_EXCEL export) from the answer journal, in input order"""
+    log_message("Compacting answer journal...")
+    journaled = checkpoint.read_journal(ANSWER_JOURNAL)
+
+    results = []
+    for (idx, row), key in zip(df.iterrows(), keys):
+        context = journaled.get(f"context:{key}", {}).get("context", "")
+        answers = {model: journaled.get(f"answer:{key}:{model}", {}).get("answer", "") for model in llm_models}
+        results.append(build_record(row, context, answers, llm_models))
+
     # Save results
-    log_message("Saving results to Excel...")
-    pd.DataFrame(results).to_excel(OUTPUT_EXCEL, index=False, engine="openpyxl")
-    log_message(f"Results saved to {OUTPUT_EXCEL}")
+    results_df = pd.DataFrame(results)
+    if results_store.write_table(results_df, RESULTS_TABLE, CONTEXTS_TABLE):
+        log_message(f"Results saved to {RESULTS_TABLE}")
+    else:
+        log_message("pyarrow is not installed, saving results to Excel only")
+
+    if EXPORT_EXCEL or not results_store.HAVE_PARQUET:
+        log_message("Exporting results to Excel...")
+        results_df.to_excel(OUTPUT_EXCEL, index=False, engine="openpyxl")
+        log_message(f"Results saved to {OUTPUT_EXCEL}")
+
+
+
+
+def report_stream_metrics():
+    """Log per-model streaming latency and save the per-call timings to STREAM_METRICS_TABLE"""
+    if not providers.stream_metrics:
+        return
+    
+    timings = pd.DataFrame(providers.stream_metrics)
+    summary = timings.groupby("model").agg(
+        calls=("total", "size"),
+        ttft_p50=("ttft", "median"),
+        ttft_p95=("ttft", lambda values: values.quantile(0.95)),
+        tokens_per_s=("tokens_per_s", "mean"),
+        total_p50=("total", "median")
+    )
+    for model, row in summary.iterrows():
+        log_message(
+            f"{model}: {int(row['calls'])} streamed calls, first token p50 {row['ttft_p50']:.2f}s "
+            f"/ p95 {row['ttft_p95']:.2f}s, {row['tokens_per_s']:.1f} tok/s, total p50 {row['total_p50']:.2f}s"
+        )
+    
+    if results_store.write_table(timings, STREAM_METRICS_TABLE):
+        log_message(f"Streaming metrics saved to {STREAM_METRICS_TABLE}")
 
 
 
+def write_run_report():
+    """Save the run's stage timings, token usage and cost to RUN_REPORT"""
+    # test2 is only loaded if this run evaluated (PIPELINE)
+    judge = sys.modules.get("test2")
+    report = metrics.write_report(RUN_REPORT, {
+        "embedding_requests": embeddings.stats,
+        "retries": rate_limiter.retry_counts,
+        "judge_parse_failures": judge.parse_failures if judge else {}
+    })
+    
+    slowest = sorted(
+        ((stats["total_s"], stage, label) for stage, labels in report["stages"].items() for label, stats in labels.items()),
+        reverse=True
+    )[:3]
+    for total, stage, label in slowest:
+        log_message(f"Time in {stage}{'' if label == 'all' else ' (' + label + ')'}: {total:.1f}s")
+    log_message(f"Estimated API cost: ${report['estimated_cost_usd']:.4f}. Run report saved to {RUN_REPORT}")
+
+
 
 # --------------------------
 # Main Execution (with logging)
@@ -343,19 +631,24 @@ def process_questions(index):
 
 def main():
     log_message("=== Starting main execution ===")
+    metrics.start_exporter()
     
     try:
-        log_message("Initializing Pinecone...")
-        index = initialize_pinecone()
+        log_message("Initializing vector index...")
+        index = open_index()
         
-        if index.describe_index_stats()["total_vector_count"] == 0:
-            log_message("No documents found in index, processing documents...")
-            process_documents(index)
-        else:
-            log_message("Documents already exist in index")
+        log_message("Synchronizing documents with index...")
+        process_documents(index)
         
         log_message("Starting question processing...")
         process_questions(index)
+        report_stream_metrics()
+        write_run_report()
+        
+        log_message(
+            f"Embedding requests: {embeddings.stats['requests']}, "
+            f"cache hits: {embeddings.stats['cache_hits']}, misses: {embeddings.stats['cache_misses']}"
+        )
         
     except Exception as e:
         log_message(f"Critical error: {str(e)}")
@@ -363,9 +656,46 @@ def main():
     
     log_message("=== Execution completed successfully ===")
 
+def run_pipeline():
+    """Answer and evaluate in one pass: each answered question goes straight to the judge.
+
+    Evaluation of a question starts while later questions are still being
+    answered, and the results never round-trip through a file. RESULTS_TABLE
+    (and OUTPUT_EXCEL, when EXPORT_EXCEL is set) is still written at the end.
+    """
+    log_message("=== Starting pipeline execution ===")
+    metrics.start_exporter()
+    
+    try:
+        log_message("Initializing vector index...")
+        index = open_index()
+        
+        log_message("Synchronizing documents with index...")
+        process_documents(index)
+        
+        import test2
+        
+        log_message("Starting question processing and evaluation...")
+        df, keys = load_questions()
+        test2.evaluate_records(answer_records(index, df, keys))
+        
+        compact_answers(df, keys, LLM_MODELS)
+        report_stream_metrics()
+        write_run_report()
+        
+    except Exception as e:
+        log_message(f"Critical error: {str(e)}")
+        raise
+    
+    log_message("=== Pipeline completed successfully ===")
+
 if __name__ == "__main__":
-    main()
-    test2.main()
+    if PIPELINE:
+        run_pipeline()
+    else:
+        main()
+        import test2
+        test2.main()
 
 
 
@@ -384,6 +714,7 @@ pip install Pinecone
 pip install tiktoken
 pip install openai
 pip install pandas
+pip install pyarrow
 
 
 '''
@@ -0,0 +1,252 @@
+"""
+Run metrics: stage timings, token usage and estimated cost.
+
+The pipeline records how long each stage takes (chunking, embedding,
+upsert, retrieval, every LLM and judge request, and apart from those the
+rate-limit waits and retry back-off) and the token usage reported by
+every API response. write_report() saves them as a JSON run report;
+while a run is going the same numbers are kept in Prometheus text format
+under METRICS_DIR, which simple_server.py serves at GET /metrics. Files
+no script has rewritten for METRICS_MAX_AGE are removed.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Prometheus text files, one per running script
+METRICS_DIR = "../middleFiles/metrics"
+EXPORT_INTERVAL = 15  # seconds between rewrites of the Prometheus file during a run
+METRICS_MAX_AGE = 24 * 3600  # seconds after which a file no run rewrites is deleted
+
+# USD per million input/output tokens by provider model id, for cost estimates.
+# List prices at the time of writing; set them to your account's rates.
+PRICES = {
+    "gpt-4": {"input": 30.0, "output": 60.0},
+    "gpt-4o": {"input": 2.5, "output": 10.0},
+    "deepseek-reasoner": {"input": 0.55, "output": 2.19},
+    "grok-3": {"input": 3.0, "output": 15.0},
+    "claude-3-opus-20240229": {"input": 15.0, "output": 75.0},
+    "gemini-2.5-flash-preview-05-20": {"input": 0.15, "output": 0.6},
+    "text-embedding-3-small": {"input": 0.02, "output": 0.0}
+}
+
+_lock = threading.Lock()
+_timings = {}  # (stage, label) -> [seconds, ...]
+_usage = {}    # (caller, model id) -> {"calls", "input_tokens", "output_tokens"}
+_started = time.time()
+
+
+def run_name():
+    """Name of the running script (main, test2, ...)"""
+    return os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0] or "python"
+
+
+def observe(stage, seconds, label=""):
+    """Record one timing of a stage; label tells apart e.g. the models of the llm stage"""
+    with _lock:
+        _timings.setdefault((stage, label), []).append(seconds)
+
+
+@contextmanager
+def timed(stage, label=""):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start, label)
+
+
+def timed_iter(stage, iterable, label=""):
+    """Yield from iterable, recording the time spent producing each item as one total"""
+    iterator = iter(iterable)
+    elapsed = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed += time.perf_counter() - start
+            yield item
+    finally:
+        observe(stage, elapsed, label)
+
+
+def usage_of(response):
+    """(input tokens, output tokens) reported by an OpenAI, Anthropic or Gemini response"""
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        input_tokens = getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", None) or 0
+        output_tokens = getattr(usage, "completion_tokens", None) or getattr(usage, "output_tokens", None) or 0
+        return input_tokens, output_tokens
+
+    metadata = getattr(response, "usage_metadata", None)
+    if metadata is not None:
+        return metadata.prompt_token_count or 0, metadata.candidates_token_count or 0
+    return 0, 0
+
+
+def add_usage(caller, model, input_tokens=0, output_tokens=0):
+    """Count the tokens of one API call made for caller (a model name, "judge" or "embeddings")"""
+    with _lock:
+        entry = _usage.setdefault((caller, model), {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+        entry["calls"] += 1
+        entry["input_tokens"] += input_tokens or 0
+        entry["output_tokens"] += output_tokens or 0
+
+
+def cost(model, input_tokens, output_tokens):
+    """Estimated USD cost, or None for a model without a price"""
+    price = PRICES.get(model)
+    if price is None:
+        return None
+    return (input_tokens * price["input"] + output_tokens * price["output"]) / 1e6
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def snapshot():
+    """Current timings and usage as plain data"""
+    with _lock:
+        timings = {key: sorted(values) for key, values in _timings.items()}
+        usage = {key: dict(entry) for key, entry in _usage.items()}
+
+    stages = {}
+    for (stage, label), values in sorted(timings.items()):
+        stages.setdefault(stage, {})[label or "all"] = {
+            "count": len(values),
+            "total_s": sum(values),
+            "mean_s": sum(values) / len(values),
+            "p50_s": _percentile(values, 0.5),
+            "p95_s": _percentile(values, 0.95),
+            "max_s": values[-1]
+        }
+
+    tokens = {}
+    for (caller, model), entry in sorted(usage.items()):
+        tokens.setdefault(caller, {})[model] = {
+            **entry,
+            "cost_usd": cost(model, entry["input_tokens"], entry["output_tokens"])
+        }
+
+    total_cost = sum(
+        entry["cost_usd"] for models in tokens.values() for entry in models.values() if entry["cost_usd"]
+    )
+    return {"stages": stages, "tokens": tokens, "estimated_cost_usd": total_cost}
+
+
+def write_report(path, extra=None):
+    """Save the run report (timings, tokens, cost and any extra counters) as JSON"""
+    report = {
+        "run": run_name(),
+        "started": datetime.fromtimestamp(_started).isoformat(timespec="seconds"),
+        "duration_s": time.time() - _started,
+        **snapshot(),
+        **(extra or {})
+    }
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+
+    write_prometheus()
+    return report
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in labels.items())
+
+
+def prometheus_text():
+    """The current metrics in Prometheus text exposition format"""
+    data = snapshot()
+    run = run_name()
+    lines = [
+        "# HELP ayvo_stage_seconds Time spent per pipeline stage",
+        "# TYPE ayvo_stage_seconds summary"
+    ]
+    for stage, labels in data["stages"].items():
+        for label, stats in labels.items():
+            base = _labels(run=run, stage=stage, label=label)
+            lines.append(f'ayvo_stage_seconds{{{base},quantile="0.5"}} {stats["p50_s"]:.6f}')
+            lines.append(f'ayvo_stage_seconds{{{base},quantile="0.95"}} {stats["p95_s"]:.6f}')
+            lines.append(f"ayvo_stage_seconds_sum{{{base}}} {stats['total_s']:.6f}")
+            lines.append(f"ayvo_stage_seconds_count{{{base}}} {stats['count']}")
+
+    lines += ["# HELP ayvo_tokens_total Tokens reported by API responses", "# TYPE ayvo_tokens_total counter"]
+    for caller, models in data["tokens"].items():
+        for model, entry in models.items():
+            for direction in ("input", "output"):
+                labels = _labels(run=run, caller=caller, model=model, direction=direction)
+                lines.append(f"ayvo_tokens_total{{{labels}}} {entry[direction + '_tokens']}")
+
+    lines += ["# HELP ayvo_api_calls_total API calls with reported usage", "# TYPE ayvo_api_calls_total counter"]
+    for caller, models in data["tokens"].items():
+        for model, entry in models.items():
+            lines.append(f"ayvo_api_calls_total{{{_labels(run=run, caller=caller, model=model)}}} {entry['calls']}")
+
+    lines += ["# HELP ayvo_cost_usd_total Estimated API cost", "# TYPE ayvo_cost_usd_total counter"]
+    for caller, models in data["tokens"].items():
+        for model, entry in models.items():
+            if entry["cost_usd"] is not None:
+                labels = _labels(run=run, caller=caller, model=model)
+                lines.append(f"ayvo_cost_usd_total{{{labels}}} {entry['cost_usd']:.6f}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus():
+    """Rewrite this script's file under METRICS_DIR"""
+    if not METRICS_DIR:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f"{run_name()}.prom")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(path + ".tmp", path)
+
+
+def prune_prometheus():
+    """Delete files under METRICS_DIR (left by earlier runs) not rewritten for METRICS_MAX_AGE"""
+    if not METRICS_DIR or not os.path.isdir(METRICS_DIR):
+        return
+    cutoff = time.time() - METRICS_MAX_AGE
+    for name in os.listdir(METRICS_DIR):
+        path = os.path.join(METRICS_DIR, name)
+        try:
+            if name.endswith((".prom", ".tmp")) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+_exporter = None
+
+
+def start_exporter():
+    """Rewrite the Prometheus file every EXPORT_INTERVAL seconds for the rest of the run"""
+    global _exporter
+    if _exporter is not None or not METRICS_DIR:
+        return
+    prune_prometheus()
+
+    def export():
+        while True:
+            time.sleep(EXPORT_INTERVAL)
+            try:
+                write_prometheus()
+            except OSError as e:
+                print(f"Could not write metrics: {e}")
+
+    _exporter = threading.Thread(target=export, name="metrics-exporter", daemon=True)
+    _exporter.start()
@@ -0,0 +1,257 @@
+"""
+Registry of the LLM providers that answer questions.
+
+Each model in providers.json names a provider type (an OpenAI-compatible
+API, Anthropic or Gemini), the provider's model id and request parameters,
+its API key, timeout, concurrency and rate limits. Clients are built on
+first use and kept for the life of the process, so every call to a model
+reuses the keep-alive connections of that model's SDK client. Every
+provider offers the same interface: generate(prompt), and
+generate_streaming(prompt) to receive the answer as it is produced while
+timing it.
+"""
+import abc
+import json
+import os
+import threading
+import time
+
+import metrics
+import rate_limiter
+
+PROVIDERS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "providers.json")
+
+DEFAULT_TIMEOUT = 120      # seconds per request
+DEFAULT_CONCURRENCY = 1
+
+# Timings of every streamed call in this process (see Provider.generate_streaming)
+stream_metrics = []
+_stream_metrics_lock = threading.Lock()
+
+
+class Provider(abc.ABC):
+    """One model behind a provider API; subclasses implement the requests"""
+
+    def __init__(self, name, config):
+        self.name = name
+        self.model = config["model"]
+        self.params = dict(config.get("params", {}))
+        self.system_prompt = config.get("system_prompt")
+        self.base_url = config.get("base_url")
+        self.timeout = config.get("timeout", DEFAULT_TIMEOUT)
+        self.concurrency = config.get("concurrency", DEFAULT_CONCURRENCY)
+        self.api_key = config.get("api_key") or os.environ.get(config.get("api_key_env", ""), "")
+
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def settings(self):
+        """Model id and request parameters, as passed to the API"""
+        return {"model": self.model, **self.params}
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = self.make_client()
+            return self._client
+
+    def messages(self, prompt):
+        messages = [{"role": "user", "content": prompt}]
+        if self.system_prompt:
+            messages.insert(0, {"role": "system", "content": self.system_prompt})
+        return messages
+
+    @abc.abstractmethod
+    def make_client(self):
+        """The provider's SDK client"""
+
+    @abc.abstractmethod
+    def generate(self, prompt):
+        """Answer text for a prompt; raises on API errors"""
+
+    @abc.abstractmethod
+    def stream(self, prompt, usage):
+        """Yield the answer text in pieces; sets usage["output_tokens"] if the API reports it"""
+
+    def generate_streaming(self, prompt, on_partial=None):
+        """
+        Answer text for a prompt, streamed; on_partial(text so far) is called
+        after every piece. Returns (text, metrics) with the time to first
+        token, total latency and output tokens per second, which are also
+        appended to stream_metrics.
+        """
+        usage = {}
+        text = ""
+        first = None
+        start = time.perf_counter()
+
+        for piece in self.stream(prompt, usage):
+            if not piece:
+                continue
+            if first is None:
+                first = time.perf_counter()
+            text += piece
+            if on_partial:
+                on_partial(text)
+
+        end = time.perf_counter()
+        metrics.add_usage(self.name, self.model, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+        tokens = usage.get("output_tokens") or rate_limiter.estimate_tokens(text)
+        timing = {
+            "model": self.name,
+            "ttft": first - start if first is not None else None,
+            "total": end - start,
+            "output_tokens": tokens,
+            "tokens_per_s": tokens / (end - first) if first is not None and end > first else None
+        }
+        with _stream_metrics_lock:
+            stream_metrics.append(timing)
+        return text, timing
+
+
+class OpenAIProvider(Provider):
+    """OpenAI and OpenAI-compatible APIs (DeepSeek, xAI)"""
+
+    def make_client(self):
+        from openai import OpenAI
+
+        return OpenAI(api_key=self.api_key, base_url=self.base_url, timeout=self.timeout, max_retries=0)
+
+    def generate(self, prompt):
+        response = self.client().chat.completions.create(messages=self.messages(prompt), **self.settings)
+        metrics.add_usage(self.name, self.model, *metrics.usage_of(response))
+        return response.choices[0].message.content
+
+    def stream(self, prompt, usage):
+        response = self.client().chat.completions.create(
+            messages=self.messages(prompt),
+            stream=True,
+            stream_options={"include_usage": True},
+            **self.settings
+        )
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if getattr(chunk, "usage", None):
+                usage["input_tokens"] = chunk.usage.prompt_tokens
+                usage["output_tokens"] = chunk.usage.completion_tokens
+
+
+class AnthropicProvider(Provider):
+
+    def make_client(self):
+        import anthropic
+
+        return anthropic.Anthropic(api_key=self.api_key, base_url=self.base_url, timeout=self.timeout, max_retries=0)
+
+    def request(self, prompt):
+        request = {"messages": [{"role": "user", "content": prompt}], **self.settings}
+        if self.system_prompt:
+            request["system"] = self.system_prompt
+        return request
+
+    def generate(self, prompt):
+        response = self.client().messages.create(**self.request(prompt))
+        metrics.add_usage(self.name, self.model, *metrics.usage_of(response))
+        return response.content[0].text
+
+    def stream(self, prompt, usage):
+        with self.client().messages.stream(**self.request(prompt)) as response:
+            yield from response.text_stream
+            usage["input_tokens"], usage["output_tokens"] = metrics.usage_of(response.get_final_message())
+
+
+class GeminiProvider(Provider):
+    """Gemini through google.generativeai; one GenerativeModel is reused for every call"""
+
+    def make_client(self):
+        import google.generativeai as genai
+
+        genai.configure(api_key=self.api_key)
+        return genai.GenerativeModel(
+            self.model,
+            system_instruction=self.system_prompt,
+            generation_config=self.params or None
+        )
+
+    def generate(self, prompt):
+        response = self.client().generate_content(prompt, request_options={"timeout": self.timeout})
+        metrics.add_usage(self.name, self.model, *metrics.usage_of(response))
+        return response.text
+
+    def stream(self, prompt, usage):
+        response = self.client().generate_content(prompt, stream=True, request_options={"timeout": self.timeout})
+        for chunk in response:
+            yield chunk.text
+            metadata = getattr(chunk, "usage_metadata", None)
+            if metadata and metadata.candidates_token_count:
+                usage["input_tokens"], usage["output_tokens"] = metrics.usage_of(chunk)
+
+
+PROVIDER_TYPES = {
+    "openai": OpenAIProvider,
+    "anthropic": AnthropicProvider,
+    "gemini": GeminiProvider
+}
+
+
+_config = None
+_providers = {}
+_registry_lock = threading.Lock()
+
+
+def load_config(path=None):
+    """Read the model entries of providers.json; their rate limits go to rate_limiter"""
+    with open(path or PROVIDERS_FILE, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    for name, entry in config.items():
+        if entry.get("type") not in PROVIDER_TYPES:
+            raise ValueError(f"{name}: unknown provider type {entry.get('type')!r}")
+        if "limits" in entry:
+            rate_limiter.PROVIDER_LIMITS[name] = entry["limits"]
+    return config
+
+
+def get_config():
+    global _config
+    with _registry_lock:
+        if _config is None:
+            _config = load_config()
+        return _config
+
+
+def get_provider(name):
+    """The provider for a model name in providers.json, built on first use"""
+    config = get_config()
+    with _registry_lock:
+        if name not in _providers:
+            if name not in config:
+                raise KeyError(f"{name} is not configured in {PROVIDERS_FILE}")
+            _providers[name] = PROVIDER_TYPES[config[name]["type"]](name, config[name])
+        return _providers[name]
+
+
+def enabled_models():
+    """Names of the models to answer and evaluate, in providers.json order; "enabled": false leaves one out"""
+    return [name for name, entry in get_config().items() if entry.get("enabled", True)]
+
+
+def model_settings():
+    """
+    {model name: settings} for every configured model, without building any
+    client: the model id, request parameters and system prompt that make up
+    the response cache key
+    """
+    settings = {}
+    for name, entry in get_config().items():
+        settings[name] = {"model": entry["model"], **entry.get("params", {})}
+        if entry.get("system_prompt"):
+            settings[name]["system_prompt"] = entry["system_prompt"]
+    return settings
+
+
+def model_concurrency():
+    """{model name: max in-flight calls} for every configured model"""
+    return {name: entry.get("concurrency", DEFAULT_CONCURRENCY) for name, entry in get_config().items()}
@@ -0,0 +1,182 @@
+"""
+Shared rate limiting and retry for every outbound API call.
+
+Each provider gets token buckets for requests and tokens per minute, so
+calls go out as fast as the quota allows and no faster. Failed calls are
+retried on 429/5xx and connection errors with exponential backoff and
+jitter; a retry-after header from the provider takes precedence, and a
+429 pauses every caller of that provider, not just the one that got it.
+"""
+import email.utils
+import random
+import threading
+import time
+
+import metrics
+
+# Requests and tokens per minute by provider (None = unlimited).
+# Set these to your account's quotas; the answering models' limits are in providers.json.
+PROVIDER_LIMITS = {
+    "judge": {"rpm": 500, "tpm": 30000},
+    "embeddings": {"rpm": 3000, "tpm": 1000000},
+    "pinecone": {"rpm": None, "tpm": None}
+}
+
+MAX_RETRIES = 5
+BASE_DELAY = 1.0   # seconds, doubled on every retry
+MAX_DELAY = 60.0
+
+RETRY_STATUS = {408, 409, 429}
+RETRY_ERRORS = (
+    "APIConnectionError", "APITimeoutError", "ConnectionError", "Timeout", "TimeoutError",
+    "ServiceUnavailable", "ResourceExhausted", "DeadlineExceeded", "InternalServerError"
+)
+
+
+class TokenBucket:
+    """Continuously refilled budget of `per_minute` units.
+
+    reserve() never blocks: it takes the units (the level may go negative)
+    and returns how long the caller has to wait before using them, which
+    keeps waiting callers in arrival order.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount=1):
+        with self.lock:
+            now = time.monotonic()
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+            self.level -= min(amount, self.capacity)
+            return max(0.0, -self.level / self.rate)
+
+
+class ProviderLimiter:
+    """Request and token buckets for one provider, plus a shared back-off pause"""
+
+    def __init__(self, rpm=None, tpm=None, name=""):
+        self.name = name
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=0):
+        """Block until one request of `tokens` tokens may be sent"""
+        with self.lock:
+            wait = max(0.0, self.paused_until - time.monotonic())
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        if wait:
+            metrics.observe("rate_limit_wait", wait, self.name)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold back every caller for `seconds` (after a 429)"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+# Retries per provider in this process
+retry_counts = {}
+
+
+def get_limiter(provider):
+    with _limiters_lock:
+        if provider not in _limiters:
+            limits = PROVIDER_LIMITS.get(provider, {})
+            _limiters[provider] = ProviderLimiter(limits.get("rpm"), limits.get("tpm"), provider)
+        return _limiters[provider]
+
+
+def estimate_tokens(text, max_output=0):
+    """Rough token count of a request: ~4 characters per token plus the output allowance"""
+    return len(text) // 4 + max_output
+
+
+def status_code(error):
+    """HTTP status of an SDK exception, if it has one"""
+    for attr in ("status_code", "code", "status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def retry_after(error):
+    """Seconds requested by the provider's retry-after headers, if any"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        parsed = email.utils.parsedate_to_datetime(value)
+        return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+def is_retryable(error):
+    status = status_code(error)
+    if status is not None:
+        return status in RETRY_STATUS or status >= 500
+    return type(error).__name__ in RETRY_ERRORS
+
+
+def call_with_retry(provider, fn, *args, tokens=0, stage=None, label="", **kwargs):
+    """Call fn(*args, **kwargs) within the provider's limits, retrying transient failures.
+
+    With a stage, every attempt is timed as metrics stage/label on its own:
+    time spent waiting for the limiter (rate_limit_wait) or backing off
+    before a retry (retry_wait) is recorded separately, not as latency.
+    """
+    limiter = get_limiter(provider)
+
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire(tokens)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            error = e
+        finally:
+            if stage:
+                metrics.observe(stage, time.perf_counter() - start, label)
+
+        if attempt == MAX_RETRIES or not is_retryable(error):
+            raise error
+
+        delay = retry_after(error)
+        if delay is None:
+            backoff = min(MAX_DELAY, BASE_DELAY * 2 ** attempt)
+            delay = backoff / 2 + random.uniform(0, backoff / 2)
+        if status_code(error) == 429:
+            limiter.pause(delay)
+
+        with _limiters_lock:
+            retry_counts[provider] = retry_counts.get(provider, 0) + 1
+        print(f"{provider}: {type(error).__name__} ({error}), retry {attempt + 1}/{MAX_RETRIES} in {delay:.1f}s")
+        metrics.observe("retry_wait", delay, provider)
+        time.sleep(delay)
@@ -0,0 +1,205 @@
+"""
+Evaluation results for the dashboards, served by simple_server.py under /results.
+
+result.html, compare.html and charts.html used to download the Excel
+reports and parse them in the browser on every load. Here each report is
+read once (the Parquet table test2.py writes, or its Excel export when
+there is no table), its summary, category and comparison tables are
+computed with test2.build_reports and kept as ready JSON until the file
+changes. Every response has an ETag and Last-Modified built from the
+size and modification time of the files it comes from, so a page that
+already has the data gets a 304. Detailed rows are served a page at a
+time.
+
+    GET /results                          models with evaluation results
+    GET /results/models/<model>           summary and category tables of a model
+    GET /results/models/<model>/rows      detailed rows, ?offset=&limit=
+    GET /results/comparison               the comparison table and one pivot per metric
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from email.utils import formatdate
+
+import pandas as pd
+
+import results_store
+import test2
+
+# Where test2.py writes its reports (relative to the server's working directory, like its scripts)
+OUTPUT_DIR = os.path.join('..', 'outputFiles')
+MODEL_SUFFIX = '_evaluation_results'
+COMPARISON_REPORT = 'models_comparison_report'
+CONTEXTS_TABLE = 'contexts.parquet'
+
+PAGE_ROWS = 100       # detailed rows per page unless ?limit= asks otherwise
+MAX_PAGE_ROWS = 1000
+MAX_CACHED_REPORTS = 16  # reports kept in memory, detailed rows included
+
+_reports = OrderedDict()  # source file -> (signature, report)
+_lock = threading.Lock()
+
+
+class Response:
+    """A JSON body and the validators of the files it was computed from"""
+
+    def __init__(self, data, signature):
+        self.body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        # Weak: the same data may go out gzip-compressed or not
+        self.etag = 'W/"' + hashlib.sha1(repr(signature).encode('utf-8')).hexdigest()[:20] + '"'
+        self.mtime = max((mtime_ns for _, mtime_ns, _ in signature), default=0) // 10**9
+        self.last_modified = formatdate(self.mtime, usegmt=True)
+
+
+def table_json(df):
+    """A table as {"columns": [...], "rows": [[...], ...]}, NaN as null"""
+    split = json.loads(df.to_json(orient='split', index=False, date_format='iso'))
+    return {'columns': split['columns'], 'rows': split['data']}
+
+
+def source(name):
+    """The file a report is read from: its Parquet table, else its Excel export (None if neither)"""
+    base = os.path.join(OUTPUT_DIR, name)
+    candidates = [base + '.parquet'] if results_store.HAVE_PARQUET else []
+    candidates.append(base + '.xlsx')
+    return next((path for path in candidates if os.path.exists(path)), None)
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return (os.path.basename(path), stat.st_mtime_ns, stat.st_size)
+
+
+def model_names():
+    """File names (lower-cased model names) of every model with an evaluation report"""
+    names = set()
+    for filename in os.listdir(OUTPUT_DIR) if os.path.isdir(OUTPUT_DIR) else []:
+        stem, extension = os.path.splitext(filename)
+        if stem.endswith(MODEL_SUFFIX) and extension in ('.parquet', '.xlsx'):
+            names.add(stem[:-len(MODEL_SUFFIX)])
+    return sorted(names)
+
+
+def cached(path, load, joined=()):
+    """The report computed by load(path), recomputed only when the file or a file joined into it has changed"""
+    signature = tuple(file_signature(p) for p in (path, *joined) if p == path or os.path.exists(p))
+    with _lock:
+        entry = _reports.get(path)
+        if entry is not None and entry[0] == signature:
+            _reports.move_to_end(path)
+            return entry[1]
+
+    report = load(path)
+    report['signature'] = signature
+    with _lock:
+        _reports[path] = (signature, report)
+        _reports.move_to_end(path)
+        while len(_reports) > MAX_CACHED_REPORTS:
+            _reports.popitem(last=False)
+    return report
+
+
+def load_model(path):
+    if path.endswith('.parquet'):
+        contexts = os.path.join(OUTPUT_DIR, CONTEXTS_TABLE)
+        table = results_store.read_table(path, contexts if os.path.exists(contexts) else None)
+    else:
+        table = pd.read_excel(path, sheet_name='Detailed Evaluation', engine='openpyxl')
+
+    # The file name is lower-cased; the answer column keeps the model's own name
+    stem = os.path.splitext(os.path.basename(path))[0][:-len(MODEL_SUFFIX)]
+    model = next((column[:-len(' Answer')] for column in table.columns if column.endswith(' Answer')), stem)
+
+    reports = test2.build_reports({model: table})
+    summary = reports['summary'].loc[model].rename_axis('Metric').reset_index()
+    summary['Metric'] = summary['Metric'].astype(str)
+    categories = reports['category_means'].loc[model].set_axis(list(test2.SCORE_COLUMNS), axis=1)
+
+    return {
+        'table': table,
+        'data': {
+            'key': stem,
+            'model': model,
+            'rows': len(table),
+            'summary': table_json(summary),
+            'categories': table_json(categories.rename_axis('Category').reset_index())
+        }
+    }
+
+
+def load_comparison(path):
+    if path.endswith('.parquet'):
+        comparison = pd.read_parquet(path)
+    else:
+        comparison = pd.read_excel(path, sheet_name='Model Comparison', engine='openpyxl')
+
+    metrics = [column for column in comparison.columns if column not in ('Model', 'Category')]
+    pivots = comparison.pivot(index='Category', columns='Model', values=metrics)
+    pivots.columns.names = [None, None]
+
+    # Named like the sheets of the Excel report
+    sheets = {'Model Comparison': table_json(comparison)}
+    for metric in metrics:
+        sheets[f'{metric} Comparison'] = table_json(pivots[metric].reset_index())
+
+    return {'data': {
+        'models': list(pd.unique(comparison['Model'])),
+        'metrics': metrics,
+        'sheets': sheets
+    }}
+
+
+def model_report(name):
+    """Cached report of one model (name as in the file name, any case); KeyError if there is none"""
+    # Only names of existing reports ever become a path
+    if name.lower() not in model_names():
+        raise KeyError(f"No evaluation results for {name}")
+    path = source(name.lower() + MODEL_SUFFIX)
+    joined = [os.path.join(OUTPUT_DIR, CONTEXTS_TABLE)] if path.endswith('.parquet') else []
+    return cached(path, load_model, joined)
+
+
+def models():
+    reports = [model_report(name) for name in model_names()]
+    data = {'models': [{key: report['data'][key] for key in ('key', 'model', 'rows')} for report in reports]}
+    return Response(data, sum((report['signature'] for report in reports), ()))
+
+
+def model(name):
+    report = model_report(name)
+    return Response(report['data'], report['signature'])
+
+
+def rows(name, offset=0, limit=PAGE_ROWS):
+    """One page of a model's detailed rows"""
+    if offset < 0 or not 0 < limit <= MAX_PAGE_ROWS:
+        raise ValueError(f"offset must be 0 or more and limit between 1 and {MAX_PAGE_ROWS}")
+    report = model_report(name)
+    table = report['table']
+    page = table_json(table.iloc[offset:offset + limit])
+    data = {'model': report['data']['model'], 'total': len(table), 'offset': offset, 'limit': limit, **page}
+    return Response(data, report['signature'])
+
+
+def comparison():
+    path = source(COMPARISON_REPORT)
+    if path is None:
+        raise KeyError("No comparison report")
+    report = cached(path, load_comparison)
+    return Response(report['data'], report['signature'])
+
+
+def precompute():
+    """Load every report now, so the first dashboard request is served from memory"""
+    for name in model_names():
+        try:
+            model_report(name)
+        except Exception as e:
+            print(f"Could not load results for {name}: {e}")
+    if source(COMPARISON_REPORT):
+        try:
+            comparison()
+        except Exception as e:
+            print(f"Could not load the comparison report: {e}")
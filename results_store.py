@@ -0,0 +1,80 @@
+"""
+Columnar storage for results and evaluation tables.
+
+Tables are written as Parquet. The retrieved Context text, which repeats on
+every row (and across every model's evaluation), is stored once per
+distinct context in a separate contexts table and referenced by id.
+Excel files are only produced as an export of these tables.
+"""
+import importlib.util
+import os
+
+import pandas as pd
+
+import cache
+
+# pandas' Parquet engine; looked up without importing it, pandas loads it on the first Parquet read/write
+HAVE_PARQUET = importlib.util.find_spec("pyarrow") is not None
+
+
+def context_id(text):
+    """Id of a context text in the contexts table"""
+    return cache.text_hash(str(text))[:16]
+
+
+def split_contexts(df, column="Context"):
+    """Replace a text column by context ids; returns (table, contexts)"""
+    if column not in df.columns:
+        return df, pd.DataFrame({"context_id": [], "text": []})
+
+    texts = df[column].fillna("").astype(str)
+    ids = texts.map(context_id)
+    table = df.drop(columns=[column])
+    table.insert(list(df.columns).index(column), "context_id", ids.values)
+    contexts = pd.DataFrame({"context_id": ids.values, "text": texts.values}).drop_duplicates("context_id")
+    return table, contexts
+
+
+def write_contexts(contexts, contexts_path):
+    """Merge contexts into the contexts table"""
+    if os.path.exists(contexts_path):
+        existing = pd.read_parquet(contexts_path)
+        new = contexts[~contexts["context_id"].isin(existing["context_id"])]
+        if new.empty:
+            return
+        contexts = pd.concat([existing, new], ignore_index=True)
+    contexts.reset_index(drop=True).to_parquet(contexts_path, index=False)
+
+
+def write_table(df, path, contexts_path=None):
+    """Write a results table as Parquet, moving its Context column to contexts_path.
+
+    Returns False (and writes nothing) when no Parquet engine is installed.
+    """
+    if not HAVE_PARQUET:
+        return False
+
+    df = df.copy()
+    if contexts_path:
+        df, contexts = split_contexts(df)
+        if not contexts.empty:
+            write_contexts(contexts, contexts_path)
+
+    # Parquet needs one type per column; answers and explanations may mix text with NaN
+    for column in df.columns:
+        if df[column].dtype == object:
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+
+    df.to_parquet(path, index=False)
+    return True
+
+
+def read_table(path, contexts_path=None, columns=None):
+    """Read a results table, joining the Context text back in if contexts_path is given"""
+    df = pd.read_parquet(path, columns=columns)
+    if contexts_path and "context_id" in df.columns:
+        contexts = pd.read_parquet(contexts_path).set_index("context_id")["text"]
+        position = list(df.columns).index("context_id")
+        df.insert(position, "Context", df["context_id"].map(contexts).values)
+        df = df.drop(columns=["context_id"])
+    return df
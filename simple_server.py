@@ -1,93 +1,614 @@
 #!/usr/bin/env python3
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
+import itertools
+import glob
+import gzip
 import subprocess
+import threading
 import json
 import os
 import sys
-from urllib.parse import urlparse
+import time
+import uuid
+import worker_pool
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse, parse_qs, unquote
+
+# Prometheus text files written by running scripts (metrics.METRICS_DIR)
+METRICS_DIR = os.path.join('..', 'middleFiles', 'metrics')
+
+# Scripts run at once; further jobs wait in the queue
+MAX_RUNNING_JOBS = int(os.environ.get('MAX_RUNNING_JOBS', '2'))
+# Scripts (by file name) that share journals, caches and output files: only one job of a group
+# may be queued or running. main.py runs test2.main() and writes the same evaluation journal
+# and reports. A script in no group only excludes itself.
+EXCLUSIVE_SCRIPTS = [{'main.py', 'test2.py'}]
+MAX_FINISHED_JOBS = 50  # finished jobs kept for GET /jobs
+# Warm interpreters with the heavy modules already imported (see worker_pool.py); 0 disables them
+WARM_WORKERS = int(os.environ.get('WARM_WORKERS', str(MAX_RUNNING_JOBS)))
+MAX_OUTPUT_WAIT = 30    # seconds a GET /jobs/<id>/output?wait= request may hold the connection
+
+# Output kept per job; older lines are dropped, so a long chatty run uses bounded memory
+MAX_OUTPUT_LINES = 10000
+MAX_LINE_LENGTH = 4000  # characters; longer lines are cut
+
+# Server-Sent Events (GET /jobs/<id>/events)
+SSE_FLUSH_INTERVAL = 0.25  # seconds output collects before the next batch is sent to a subscriber
+SSE_KEEPALIVE = 15         # seconds between keep-alive comments while a job is quiet
+
+FINISHED_STATES = ('succeeded', 'failed', 'cancelled')
+
+# Results responses at least this large go out gzip-compressed to clients that accept it
+GZIP_MIN_BYTES = 1024
+
+def merge_prometheus(texts):
+    """Merge the exposition texts of several scripts, keeping each metric family together"""
+    families = {}
+    for text in texts:
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            if line.startswith('#'):
+                parts = line.split()
+                name = parts[2] if len(parts) > 2 else ''
+                family = families.setdefault(name, {'comments': [], 'samples': []})
+                if line not in family['comments']:
+                    family['comments'].append(line)
+                continue
+            name = line.split('{', 1)[0].split(' ', 1)[0]
+            for suffix in ('_sum', '_count'):
+                if name.endswith(suffix) and name[:-len(suffix)] in families:
+                    name = name[:-len(suffix)]
+            families.setdefault(name, {'comments': [], 'samples': []})['samples'].append(line)
+    
+    lines = []
+    for family in families.values():
+        lines.extend(family['comments'])
+        lines.extend(family['samples'])
+    return '\n'.join(lines) + '\n'
+
+def get_python_executable():
+    """Find the best Python executable to use"""
+    
+    # Option 1: Check for virtual environment in 'env' folder
+    env_paths = [
+        os.path.join(os.getcwd(), 'env', 'Scripts', 'python.exe'),  # Windows
+        os.path.join(os.getcwd(), 'env', 'bin', 'python'),         # Linux/Mac
+        os.path.join(os.getcwd(), 'venv', 'Scripts', 'python.exe'), # Windows venv
+        os.path.join(os.getcwd(), 'venv', 'bin', 'python'),        # Linux/Mac venv
+    ]
+    
+    for path in env_paths:
+        if os.path.exists(path):
+            return path
+    
+    # Option 2: Check if we're already in a virtual environment
+    if hasattr(sys, 'real_prefix') or (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix):
+        return sys.executable
+    
+    # Option 3: Use system Python
+    return sys.executable
+
+def precompute_results():
+    """Load the evaluation reports for /results (pandas is only imported here, off the start-up path)"""
+    import results_api
+    
+    results_api.precompute()
+
+class Job:
+    """
+    One script run: its state and the last MAX_OUTPUT_LINES lines of its output
+    
+    Offsets count every line the job ever printed, so a reader that asks for
+    lines already dropped from the buffer gets the oldest ones still kept.
+    """
+    
+    def __init__(self, script):
+        self.id = uuid.uuid4().hex[:12]
+        self.script = script
+        self.status = 'queued'
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.return_code = None
+        self.output = deque(maxlen=MAX_OUTPUT_LINES)
+        self.total_lines = 0
+        self.stop = None  # terminates the running script
+        self.cancel_requested = False
+        self.changed = threading.Condition()
+    
+    def append(self, line):
+        # A carriage return redraws the line (progress bars): keep what it ends as
+        line = line.rstrip('\r\n').rsplit('\r', 1)[-1]
+        if len(line) > MAX_LINE_LENGTH:
+            line = line[:MAX_LINE_LENGTH] + ' ...'
+        with self.changed:
+            self.output.append(line)
+            self.total_lines += 1
+            self.changed.notify_all()
+    
+    def set_status(self, status, return_code=None):
+        with self.changed:
+            self.status = status
+            if status == 'running':
+                self.started = time.time()
+            elif status in FINISHED_STATES:
+                self.finished = time.time()
+                self.return_code = return_code
+            self.changed.notify_all()
+    
+    def read(self, offset, wait=0):
+        """
+        Output lines from offset on; waits up to `wait` seconds for new ones
+        
+        Returns (lines, offset of the first line, next offset, status).
+        """
+        with self.changed:
+            if wait:
+                self.changed.wait_for(lambda: self.total_lines > offset or self.status in FINISHED_STATES, wait)
+            first = self.total_lines - len(self.output)
+            start = min(max(offset, first), self.total_lines)
+            lines = list(itertools.islice(self.output, start - first, None))
+            return lines, start, self.total_lines, self.status
+    
+    def to_dict(self):
+        with self.changed:
+            return {
+                'id': self.id,
+                'script': self.script,
+                'status': self.status,
+                'created': self.created,
+                'started': self.started,
+                'finished': self.finished,
+                'return_code': self.return_code,
+                'output_lines': self.total_lines
+            }
+
+def script_group(script):
+    """Key shared by the scripts that must not run at the same time as this one"""
+    name = os.path.basename(script)
+    for group in EXCLUSIVE_SCRIPTS:
+        if name in group:
+            return tuple(sorted(group))
+    return os.path.abspath(script)
+
+class ScriptBusy(Exception):
+    """The script, or one sharing its outputs, already has a queued or running job"""
+    
+    def __init__(self, job):
+        super().__init__(f"{job.script} is already {job.status} as job {job.id}")
+        self.job = job
+
+class JobManager:
+    """Queue of script runs on a bounded pool of workers"""
+    
+    def __init__(self, workers=None):
+        self.pool = ThreadPoolExecutor(max_workers=workers or MAX_RUNNING_JOBS, thread_name_prefix='job')
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.warm_pool = None
+    
+    def start_warm_pool(self, size=None):
+        """Keep warm interpreters ready for the scripts (where os.fork exists)"""
+        size = WARM_WORKERS if size is None else size
+        if size > 0 and worker_pool.SUPPORTED:
+            self.warm_pool = worker_pool.WarmPool(get_python_executable(), size)
+        return self.warm_pool
+    
+    def submit(self, script):
+        """
+        Queue a run of a script; raises ScriptBusy if it, or a script of its
+        EXCLUSIVE_SCRIPTS group, is already queued or running
+        
+        Such runs would share a journal, caches and output files (a fresh
+        run truncates the journal the other is writing).
+        """
+        job = Job(script)
+        group = script_group(script)
+        with self.lock:
+            for other in self.jobs.values():
+                if other.status not in FINISHED_STATES and script_group(other.script) == group:
+                    raise ScriptBusy(other)
+            self.jobs[job.id] = job
+            self.prune()
+        self.pool.submit(self.run, job)
+        return job
+    
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+    
+    def list(self):
+        with self.lock:
+            return list(self.jobs.values())
+    
+    def cancel(self, job):
+        """Stop a job: a queued one never starts, a running one is terminated"""
+        with job.changed:
+            job.cancel_requested = True
+            queued = job.status == 'queued'
+            if queued:
+                job.status = 'cancelled'
+                job.finished = time.time()
+                job.changed.notify_all()
+            stop = job.stop
+        if stop is not None and not queued:
+            stop()
+    
+    def prune(self):
+        """Forget the oldest finished jobs beyond MAX_FINISHED_JOBS (call with the lock held)"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+    
+    def run(self, job):
+        with job.changed:
+            if job.status == 'cancelled':
+                return
+            job.status = 'running'
+            job.started = time.time()
+            job.changed.notify_all()
+        
+        try:
+            # Use virtual environment Python if available
+            python_executable = get_python_executable()
+            worker = self.warm_pool.acquire(python_executable) if self.warm_pool else None
+            
+            if worker is not None:
+                job.append(f"Using Python: {python_executable} (warm worker, {worker.warmup_seconds:.1f}s of imports skipped)")
+                return_code = self.run_warm(job, worker)
+            else:
+                job.append(f"Using Python: {python_executable}")
+                return_code = self.run_process(job, python_executable)
+            
+            if job.cancel_requested:
+                job.append("Job cancelled")
+                job.set_status('cancelled', return_code)
+            elif return_code != 0:
+                job.append(f"Script exited with code {return_code}")
+                job.set_status('failed', return_code)
+            else:
+                job.set_status('succeeded', return_code)
+                # The run may have written new reports: have them ready before the dashboards ask
+                threading.Thread(target=precompute_results, name='results-precompute', daemon=True).start()
+        
+        except Exception as e:
+            job.append(f"Server error: {str(e)}")
+            job.set_status('failed')
+    
+    def run_process(self, job, python_executable):
+        """Run the script in a new interpreter; returns its exit code"""
+        # Execute Python script, unbuffered so partial answers reach the page as they are printed
+        env = os.environ.copy()
+        env['PYTHONUNBUFFERED'] = '1'
+        process = subprocess.Popen(
+            [python_executable, job.script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            bufsize=1,
+            cwd=os.getcwd(),
+            env=env
+        )
+        self.set_stop(job, process.terminate)
+        
+        for line in process.stdout:
+            if line.strip():
+                job.append(line)
+        
+        return process.wait()
+    
+    def run_warm(self, job, worker):
+        """Run the script in a fork of a warm worker; returns its exit code"""
+        try:
+            return worker.run(job.script, job.append, on_start=lambda pid: self.set_stop(job, worker.cancel))
+        finally:
+            self.warm_pool.release(worker)
+    
+    def set_stop(self, job, stop):
+        """Make the running script cancellable, stopping it now if a cancel came first"""
+        with job.changed:
+            job.stop = stop
+            cancelled = job.cancel_requested
+        if cancelled:
+            stop()
+    
+    def shutdown(self):
+        for job in self.list():
+            if job.status not in FINISHED_STATES:
+                self.cancel(job)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        if self.warm_pool:
+            self.warm_pool.shutdown()
+
+jobs = JobManager()
 
 class PythonExecutorHandler(BaseHTTPRequestHandler):
     def do_OPTIONS(self):
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'POST, GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Last-Event-ID')
         self.end_headers()
-
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        
+        if url.path == '/metrics':
+            texts = []
+            for path in sorted(glob.glob(os.path.join(METRICS_DIR, '*.prom'))):
+                with open(path, 'r', encoding='utf-8') as f:
+                    texts.append(f.read())
+            body = merge_prometheus(texts).encode('utf-8')
+            
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(body)
+        
+        elif parts == ['jobs']:
+            self.send_json({'jobs': [job.to_dict() for job in jobs.list()]})
+        
+        elif len(parts) == 2 and parts[0] == 'jobs':
+            job = jobs.get(parts[1])
+            if job is None:
+                self.send_json({'error': f"Job {parts[1]} not found"}, 404)
+            else:
+                self.send_json(job.to_dict())
+        
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'output':
+            # ?offset=<lines already seen>&wait=<seconds to wait for new lines>
+            job = jobs.get(parts[1])
+            if job is None:
+                self.send_json({'error': f"Job {parts[1]} not found"}, 404)
+                return
+            try:
+                query = parse_qs(url.query)
+                offset = max(0, int(query.get('offset', ['0'])[0]))
+                wait = min(MAX_OUTPUT_WAIT, max(0.0, float(query.get('wait', ['0'])[0])))
+            except ValueError:
+                self.send_json({'error': "offset and wait must be numbers"}, 400)
+                return
+            
+            lines, start, next_offset, status = job.read(offset, wait)
+            self.send_json({
+                'id': job.id,
+                'status': status,
+                'return_code': job.return_code,
+                'offset': start,
+                'dropped': start - offset,
+                'next_offset': next_offset,
+                'lines': lines
+            })
+        
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events':
+            # EventSource sends Last-Event-ID when it reconnects; ?offset= picks the start otherwise
+            job = jobs.get(parts[1])
+            if job is None:
+                self.send_json({'error': f"Job {parts[1]} not found"}, 404)
+                return
+            try:
+                offset = self.headers.get('Last-Event-ID') or parse_qs(url.query).get('offset', ['0'])[0]
+                offset = max(0, int(offset))
+            except ValueError:
+                self.send_json({'error': "offset must be a number"}, 400)
+                return
+            
+            try:
+                self.stream_events(job, offset)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the subscriber went away; the job keeps running
+        
+        elif parts and parts[0] == 'results':
+            self.send_results(url, [unquote(part) for part in parts[1:]])
+        
+        else:
+            self.send_error_response("Not found", 404)
+    
     def do_POST(self):
-        if self.path == '/run-python':
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        
+        if parts == ['jobs']:
             try:
-                content_length = int(self.headers['Content-Length'])
-                post_data = self.rfile.read(content_length)
-                data = json.loads(post_data.decode('utf-8'))
-                
-                script_name = data.get('script', '')
+                script_name = self.read_json().get('script', '')
+            except ValueError:
+                self.send_json({'error': "Request body must be JSON"}, 400)
+                return
+            
+            if not os.path.exists(script_name):
+                self.send_json({'error': f"Script {script_name} not found"}, 404)
+                return
+            
+            try:
+                job = jobs.submit(script_name)
+            except ScriptBusy as e:
+                self.send_json({'error': str(e), 'job': e.job.to_dict()}, 409)
+                return
+            self.send_json(job.to_dict(), 202)
+        
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'cancel':
+            job = jobs.get(parts[1])
+            if job is None:
+                self.send_json({'error': f"Job {parts[1]} not found"}, 404)
+                return
+            jobs.cancel(job)
+            self.send_json(job.to_dict())
+        
+        elif self.path == '/run-python':
+            # Older clients: run as a job and stream its output in this response
+            try:
+                script_name = self.read_json().get('script', '')
                 
                 if not os.path.exists(script_name):
                     self.send_error_response(f"Script {script_name} not found")
                     return
                 
+                try:
+                    job = jobs.submit(script_name)
+                except ScriptBusy as e:
+                    self.send_error_response(str(e), 409)
+                    return
+                
                 self.send_response(200)
                 self.send_header('Content-Type', 'text/plain; charset=utf-8')
                 self.send_header('Access-Control-Allow-Origin', '*')
                 self.send_header('Cache-Control', 'no-cache')
                 self.end_headers()
                 
-                # Use virtual environment Python if available
-                python_executable = self.get_python_executable()
-                
-                self.wfile.write(f"Using Python: {python_executable}\n".encode('utf-8'))
-                self.wfile.flush()
-                
-                # Execute Python script
-                process = subprocess.Popen(
-                    [python_executable, script_name],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    universal_newlines=True,
-                    bufsize=1,
-                    cwd=os.getcwd(),
-                    env=os.environ.copy()
-                )
-                
-                for line in process.stdout:
-                    if line.strip():
-                        self.wfile.write(line.encode('utf-8'))
+                offset = 0
+                while True:
+                    lines, _, offset, status = job.read(offset, MAX_OUTPUT_WAIT)
+                    if lines:
+                        self.wfile.write(''.join(line + '\n' for line in lines).encode('utf-8'))
                         self.wfile.flush()
-                
-                return_code = process.wait()
-                
-                if return_code != 0:
-                    error_msg = f"\nScript exited with code {return_code}\n"
-                    self.wfile.write(error_msg.encode('utf-8'))
-                    
+                    if status in FINISHED_STATES and not lines:
+                        break
+                    if lines:
+                        time.sleep(SSE_FLUSH_INTERVAL)
+            
             except Exception as e:
                 self.send_error_response(f"Server error: {str(e)}")
+        
+        else:
+            self.send_error_response("Not found", 404)
     
-    def get_python_executable(self):
-        """Find the best Python executable to use"""
+    def stream_events(self, job, offset):
+        """
+        Send a job's output as Server-Sent Events until it finishes
+        
+        Each line is a message whose id is the offset after it, so a
+        reconnecting EventSource resumes where it stopped. Lines that arrive
+        together go out in one write, at most every SSE_FLUSH_INTERVAL. The
+        stream ends with a "status" event carrying the job's final state;
+        "dropped" tells how many requested lines were no longer buffered.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
         
-        # Option 1: Check for virtual environment in 'env' folder
-        env_paths = [
-            os.path.join(os.getcwd(), 'env', 'Scripts', 'python.exe'),  # Windows
-            os.path.join(os.getcwd(), 'env', 'bin', 'python'),         # Linux/Mac
-            os.path.join(os.getcwd(), 'venv', 'Scripts', 'python.exe'), # Windows venv
-            os.path.join(os.getcwd(), 'venv', 'bin', 'python'),        # Linux/Mac venv
-        ]
+        while True:
+            lines, start, next_offset, status = job.read(offset, SSE_KEEPALIVE)
+            events = []
+            if start > offset:
+                events.append(f"event: dropped\ndata: {start - offset}\n\n")
+            for i, line in enumerate(lines):
+                events.append(f"id: {start + i + 1}\ndata: {line}\n\n")
+            
+            finished = status in FINISHED_STATES and not lines
+            if finished:
+                events.append(f"event: status\ndata: {json.dumps(job.to_dict())}\n\n")
+            elif not events:
+                events.append(": keep-alive\n\n")
+            
+            self.wfile.write(''.join(events).encode('utf-8'))
+            self.wfile.flush()
+            if finished:
+                return
+            
+            offset = next_offset
+            if lines:
+                time.sleep(SSE_FLUSH_INTERVAL)
+    
+    def send_results(self, url, parts):
+        """GET /results/...: evaluation results as JSON (see results_api.py)"""
+        import results_api
         
-        for path in env_paths:
-            if os.path.exists(path):
-                return path
+        try:
+            if not parts:
+                response = results_api.models()
+            elif parts == ['comparison']:
+                response = results_api.comparison()
+            elif len(parts) == 2 and parts[0] == 'models':
+                response = results_api.model(parts[1])
+            elif len(parts) == 3 and parts[0] == 'models' and parts[2] == 'rows':
+                query = parse_qs(url.query)
+                try:
+                    offset = int(query.get('offset', ['0'])[0])
+                    limit = int(query.get('limit', [str(results_api.PAGE_ROWS)])[0])
+                except ValueError:
+                    self.send_json({'error': "offset and limit must be numbers"}, 400)
+                    return
+                response = results_api.rows(parts[1], offset, limit)
+            else:
+                self.send_json({'error': "Not found"}, 404)
+                return
+        except KeyError as e:
+            self.send_json({'error': e.args[0]}, 404)
+            return
+        except ValueError as e:
+            self.send_json({'error': str(e)}, 400)
+            return
+        except Exception as e:
+            self.send_json({'error': f"Could not read results: {e}"}, 500)
+            return
         
-        # Option 2: Check if we're already in a virtual environment
-        if hasattr(sys, 'real_prefix') or (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix):
-            return sys.executable
+        if self.not_modified(response):
+            self.send_response(304)
+            self.send_header('ETag', response.etag)
+            self.send_header('Last-Modified', response.last_modified)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            return
         
-        # Option 3: Use system Python
-        return sys.executable
+        body = response.body
+        compressed = len(body) >= GZIP_MIN_BYTES and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if compressed:
+            body = gzip.compress(body, compresslevel=5)
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if compressed:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('ETag', response.etag)
+        self.send_header('Last-Modified', response.last_modified)
+        # Cached by the browser, but checked with the server on every use
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def not_modified(self, response):
+        """Whether the request's If-None-Match or If-Modified-Since shows it already has this response"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or response.etag in tags or response.etag[2:] in tags
+        
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return response.mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+    
+    def read_json(self):
+        content_length = int(self.headers.get('Content-Length') or 0)
+        post_data = self.rfile.read(content_length)
+        return json.loads(post_data.decode('utf-8') or '{}')
+    
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
     
-    def send_error_response(self, message):
-        self.send_response(500)
+    def send_error_response(self, message, status=500):
+        self.send_response(status)
         self.send_header('Content-Type', 'text/plain')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
@@ -98,12 +619,17 @@ class PythonExecutorHandler(BaseHTTPRequestHandler):
 
 def main():
     server_address = ('localhost', 8000)
-    httpd = HTTPServer(server_address, PythonExecutorHandler)
+    httpd = ThreadingHTTPServer(server_address, PythonExecutorHandler)
     
     print("🐍 Python Execution Server with Environment Support")
     print("=" * 60)
     print(f"Server running on http://localhost:8000")
     print(f"Working directory: {os.getcwd()}")
+    print(f"Scripts run at once: {MAX_RUNNING_JOBS} (set MAX_RUNNING_JOBS to change)")
+    if jobs.start_warm_pool():
+        print(f"Warming {WARM_WORKERS} interpreters in the background (set WARM_WORKERS=0 to disable)")
+    threading.Thread(target=precompute_results, name='results-precompute', daemon=True).start()
+    print("Evaluation results served at /results")
     
     # Check for virtual environment
     env_paths = [
@@ -131,6 +657,7 @@ def main():
         httpd.serve_forever()
     except KeyboardInterrupt:
         print("\n\nServer stopped.")
+        jobs.shutdown()
         httpd.server_close()
 
 if __name__ == '__main__':
@@ -1,10 +1,195 @@
+import numpy as np
 import pandas as pd
-from openai import OpenAI
-import time
 import json
+import re
+import threading
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import cache
+import rate_limiter
+import checkpoint
+import metrics
+import providers
+import results_store
 
-# Setup client
-client = OpenAI(api_key="")
+# Setup client (built on first use by get_client)
+client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    global client
+    with _client_lock:
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI(api_key="")
+        return client
+
+# Judge model and request parameters (also part of the response cache key)
+JUDGE_SETTINGS = {"model": "gpt-4", "temperature": 0.1}
+JUDGE_SYSTEM_PROMPT = "You are an expert in evaluating AI systems. Please respond in JSON format only."
+
+# Judge calls in flight at once, across all models
+JUDGE_WORKERS = 8
+
+# Score every model's answer to a question in one judge request (per-model requests on failure)
+BATCH_JUDGE = True
+
+# Fields of one evaluation in a judge response
+JUDGE_SCORE_FIELDS = ("faithfulness", "answer_relevance", "context_relevance", "correctness", "overall_score")
+JUDGE_FIELDS = JUDGE_SCORE_FIELDS + ("explanation",)
+JUDGE_SCORE_RANGE = (1, 10)
+
+# Extra rounds for evaluations that failed (unparseable response or API error)
+JUDGE_RETRIES = 2
+
+JUDGE_CRITERIA = """    1. *Faithfulness (vs Context-Free)*: How well the answer adheres to the given context without fabricating information outside of it
+    - 10: Answer is completely based on the given context
+    - 5: Answer is partially based on context with some external information
+    - 1: Answer ignores context or fabricates information
+
+    2. *Answer Relevance (vs Incomplete)*: How relevant and complete the answer is to the question
+    - 10: Answer is completely relevant and complete
+    - 5: Answer is relevant but incomplete or contains unnecessary information
+    - 1: Answer is irrelevant or very incomplete
+
+    3. *Context Relevance (vs Noisy Context)*: How well the most relevant parts of the context are used
+    - 10: Used the most relevant parts of the context
+    - 5: Used some relevant parts while ignoring important sections
+    - 1: Did not use the relevant parts of the context
+
+    4. *correctness (vs Golden Answer)*: How accurate the answer is compared to the golden/reference answer
+    - 10: Answer is completely correct and aligns perfectly with the golden answer
+    - 5: Answer is partially correct with some key information matching the golden answer
+    - 1: Answer is incorrect or contradicts the golden answer"""
+
+# Checkpoint of completed evaluations (RESUME=1 continues it)
+EVAL_JOURNAL = "../middleFiles/evaluations_journal.jsonl"
+
+# Answers to evaluate (written by main.py); the Excel file is read only when the table is missing
+INPUT_TABLE = "../middleFiles/results_with_all_contexts.parquet"
+INPUT_CONTEXTS = "../middleFiles/contexts.parquet"
+INPUT_EXCEL = "../middleFiles/results_with_all_contexts.xlsx"
+
+# Reports are saved as Parquet next to their Excel paths; contexts go to a shared table
+OUTPUT_CONTEXTS = "../outputFiles/contexts.parquet"
+EXPORT_EXCEL = True  # also write the Excel reports read by the dashboards
+
+# Judge timings, token usage and estimated cost of an evaluation run (see metrics.py)
+RUN_REPORT = "../outputFiles/evaluation_run_report.json"
+
+def request_judge(prompt, max_output=300):
+    """
+    Judge response text for a prompt, from the response cache when possible
+    
+    Returns (content, cached); the caller stores a fresh response with
+    cache_judge_response once it has checked that it parses.
+    """
+    
+    responses = cache.response_cache()
+    content = responses.get("judge", JUDGE_SETTINGS["model"], JUDGE_SETTINGS, [JUDGE_SYSTEM_PROMPT, prompt]) if responses else None
+    if content is not None:
+        return content, True
+    
+    response = rate_limiter.call_with_retry(
+        "judge",
+        get_client().chat.completions.create,
+        messages=[
+            {"role": "system", "content": JUDGE_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        tokens=rate_limiter.estimate_tokens(JUDGE_SYSTEM_PROMPT + prompt, max_output),
+        stage="judge",
+        **JUDGE_SETTINGS
+    )
+    metrics.add_usage("judge", JUDGE_SETTINGS["model"], *metrics.usage_of(response))
+    return response.choices[0].message.content, False
+
+def cache_judge_response(prompt, content):
+    responses = cache.response_cache()
+    if responses:
+        responses.put("judge", JUDGE_SETTINGS["model"], JUDGE_SETTINGS, [JUDGE_SYSTEM_PROMPT, prompt], content)
+
+# Evaluations per model left without a usable judge response (unparseable or failing validation)
+# once the per-model fallback and retries are done, in this process
+parse_failures = {}
+_parse_failures_lock = threading.Lock()
+
+def count_parse_failure(model_name):
+    with _parse_failures_lock:
+        parse_failures[model_name] = parse_failures.get(model_name, 0) + 1
+
+def extract_json(content):
+    """
+    First JSON object in a judge response: the whole text, a ```json fenced
+    block, or an object embedded in prose. Raises ValueError if there is none.
+    """
+    
+    text = str(content).strip()
+    candidates = [text]
+    candidates += re.findall(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    
+    for candidate in candidates:
+        try:
+            result = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(result, dict):
+            return result
+    
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"\{", text):
+        try:
+            result, _ = decoder.raw_decode(text, match.start())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(result, dict):
+            return result
+    
+    raise ValueError(f"no JSON object in judge response: {text[:200]!r}")
+
+def validate_evaluation(evaluation):
+    """
+    Checked copy of one judge evaluation: every field present, scores numeric
+    and within JUDGE_SCORE_RANGE, and overall_score recomputed as the mean of
+    the four criteria. Raises ValueError otherwise.
+    """
+    
+    if not isinstance(evaluation, dict):
+        raise ValueError(f"evaluation is not an object: {evaluation!r}")
+    missing = [field for field in JUDGE_FIELDS if field not in evaluation]
+    if missing:
+        raise ValueError(f"evaluation is missing {', '.join(missing)}")
+    
+    low, high = JUDGE_SCORE_RANGE
+    result = {"explanation": str(evaluation["explanation"])}
+    for field in JUDGE_SCORE_FIELDS[:-1]:
+        value = evaluation[field]
+        if isinstance(value, bool):
+            raise ValueError(f"{field} is not a number: {value!r}")
+        try:
+            score = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} is not a number: {value!r}")
+        if not low <= score <= high:
+            raise ValueError(f"{field} is out of range: {score}")
+        result[field] = int(score) if score.is_integer() else score
+    
+    criteria = [result[field] for field in JUDGE_SCORE_FIELDS[:-1]]
+    result["overall_score"] = round(sum(criteria) / len(criteria), 2)
+    return result
+
+def failed_evaluation(error):
+    """Evaluation recorded when the judge gave no usable result; its scores are left empty"""
+    return {
+        **{field: None for field in JUDGE_SCORE_FIELDS},
+        "explanation": f"Evaluation error: {error}"
+    }
+
+def is_failed(result_row):
+    return str(result_row['Evaluation Explanation']).startswith("Evaluation error")
+
+def is_unparseable(result_row):
+    return str(result_row['Evaluation Explanation']).startswith("Evaluation error: unusable judge response")
 
 def evaluate_model_answer(category, question, golden_answer, model_answer, context, model_name):
     """
@@ -31,25 +216,7 @@ def evaluate_model_answer(category, question, golden_answer, model_answer, conte
 
     Please evaluate the {model_name} answer on the following criteria from 1 to 10:
 
-    1. *Faithfulness (vs Context-Free)*: How well the answer adheres to the given context without fabricating information outside of it
-    - 10: Answer is completely based on the given context
-    - 5: Answer is partially based on context with some external information
-    - 1: Answer ignores context or fabricates information
-
-    2. *Answer Relevance (vs Incomplete)*: How relevant and complete the answer is to the question
-    - 10: Answer is completely relevant and complete
-    - 5: Answer is relevant but incomplete or contains unnecessary information
-    - 1: Answer is irrelevant or very incomplete
-
-    3. *Context Relevance (vs Noisy Context)*: How well the most relevant parts of the context are used
-    - 10: Used the most relevant parts of the context
-    - 5: Used some relevant parts while ignoring important sections
-    - 1: Did not use the relevant parts of the context
-
-    4. *correctness (vs Golden Answer)*: How accurate the answer is compared to the golden/reference answer
-    - 10: Answer is completely correct and aligns perfectly with the golden answer
-    - 5: Answer is partially correct with some key information matching the golden answer
-    - 1: Answer is incorrect or contradicts the golden answer
+{JUDGE_CRITERIA}
 
     Return the result in JSON format only:
     {{
@@ -63,201 +230,397 @@ def evaluate_model_answer(category, question, golden_answer, model_answer, conte
     """
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are an expert in evaluating AI systems. Please respond in JSON format only."},
-                {"role": "user", "content": evaluation_prompt}
-            ],
-            temperature=0.1
-        )
-        
-        result = json.loads(response.choices[0].message.content)
-        return result
-        
+        content, cached = request_judge(evaluation_prompt)
     except Exception as e:
         print(f"Evaluation error for {model_name}: {e}")
-        return {
-            "faithfulness": 0,
-            "answer_relevance": 0,
-            "context_relevance": 0,
-            "correctness": 0,
-            "overall_score": 0,
-            "explanation": f"Evaluation error: {str(e)}"
-        }
+        return failed_evaluation(e)
+    
+    try:
+        result = validate_evaluation(extract_json(content))
+    except ValueError as e:
+        print(f"Evaluation error for {model_name}: unusable judge response ({e})")
+        return failed_evaluation(f"unusable judge response ({e})")
+    
+    # Only responses that pass validation are cached
+    if not cached:
+        cache_judge_response(evaluation_prompt, content)
+    
+    return result
 
-def process_model_answers(df, model_column, model_name):
+def evaluate_answers_batch(category, question, golden_answer, answers, context):
     """
-    Process and evaluate answers for a specific model
+    Evaluate several models' answers to one question in a single judge request
+    
+    answers is {model_name: answer}. Returns {model_name: evaluation} for the
+    answers whose evaluation came back complete; the caller evaluates the
+    rest one model at a time. The context, question and golden answer are
+    sent once instead of once per model.
     """
     
-    results = []
+    answers_text = "\n\n    ".join(f"### {model_name}\n    {answer}" for model_name, answer in answers.items())
     
-    print(f"Starting to process {model_name} answers - {len(df)} rows...")
+    evaluation_prompt = f"""
+    You are an expert in evaluating AI systems. Please evaluate each of the following answers to the same question based on the following criteria:
+
+    *Context:*
+    {context}
+
+    *Question:*
+    {question}
+
+    *Golden Answer (Reference):*
+    {golden_answer}
+
+    *Question Category:*
+    {category}
+
+    *Answers to evaluate:*
+    {answers_text}
+
+    Please evaluate every answer on its own on the following criteria from 1 to 10:
+
+{JUDGE_CRITERIA}
+
+    Return the result in JSON format only, with one entry per answer, keyed by the answer's name exactly as written after ### above:
+    {{
+        "evaluations": {{
+            "<answer name>": {{
+                "faithfulness": <score from 1-10>,
+                "answer_relevance": <score from 1-10>,
+                "context_relevance": <score from 1-10>,
+                "correctness": <score from 1-10>,
+                "overall_score": <average of all four scores>,
+                "explanation": "Brief explanation of the evaluation"
+            }}
+        }}
+    }}
+    """
     
-    for index, row in df.iterrows():
-        print(f"Processing {model_name} - row {index + 1}/{len(df)}")
-        
-        # Extract data
-        category = row['Category']
-        question = row['Questions']
-        golden_answer = row['Golden Answers']
-        model_answer = row[model_column]
-        context = row['Context']
-        
-        # Evaluate answer
+    try:
+        content, cached = request_judge(evaluation_prompt, 300 * len(answers))
+    except Exception as e:
+        print(f"Batched evaluation error, falling back to per-model requests: {e}")
+        return {}
+    
+    try:
+        evaluations = extract_json(content).get("evaluations")
+        if not isinstance(evaluations, dict):
+            raise ValueError("no evaluations object")
+    except ValueError as e:
+        evaluations = {}
+        print(f"Batched evaluation unusable ({e}), falling back to per-model requests")
+    
+    # Invalid entries are not counted as parse failures here: their per-model fallback may still succeed
+    valid = {}
+    for model_name in answers:
+        try:
+            valid[model_name] = validate_evaluation(evaluations.get(model_name))
+        except ValueError:
+            pass
+    
+    # Only complete responses are cached
+    if len(valid) == len(answers):
+        if not cached:
+            cache_judge_response(evaluation_prompt, content)
+    elif valid:
+        missing = [model_name for model_name in answers if model_name not in valid]
+        print(f"Batched evaluation incomplete for {', '.join(missing)}, falling back to per-model requests")
+    
+    return valid
+
+def evaluation_key(model_name, index, question, model_answer):
+    """Checkpoint key of one evaluation; changes if the question or answer changes"""
+    content = cache.text_hash(str(question) + "\n" + str(model_answer))[:16]
+    return f"{model_name}:{index}:{content}"
+
+def evaluate_row(row, index, model_column, model_name, journal=None, evaluation=None):
+    """
+    Evaluate one model's answer for one row
+    
+    The evaluation is appended to the journal when it completes; a row the
+    journal already holds (from a resumed run) is not evaluated again. An
+    evaluation already obtained from a batched request can be passed in.
+    """
+    
+    # Extract data
+    category = row['Category']
+    question = row['Questions']
+    golden_answer = row['Golden Answers']
+    model_answer = row[model_column]
+    context = row['Context']
+    
+    key = evaluation_key(model_name, index, question, model_answer)
+    if journal and key in journal.done and not journal.done[key]["error"]:
+        return journal.done[key]["row"]
+    
+    # Evaluate answer
+    if evaluation is None:
         evaluation = evaluate_model_answer(
             category, question, golden_answer, model_answer, context, model_name
         )
+    
+    # Add result
+    result_row = {
+        'Category': category,
+        'Questions': question,
+        'Golden Answers': golden_answer,
+        f'{model_name} Answer': model_answer,
+        'Context': context,
+        'Faithfulness Score': evaluation['faithfulness'],
+        'Answer Relevance Score': evaluation['answer_relevance'],
+        'Context Relevance Score': evaluation['context_relevance'],
+        'correctness Score': evaluation['correctness'],
+        'Overall Score': evaluation['overall_score'],
+        'Evaluation Explanation': evaluation['explanation']
+    }
+    
+    if journal:
+        journal.append(key, row=result_row, error=is_failed(result_row))
+    
+    return result_row
+
+def evaluate_question(row, index, models_config, journal=None):
+    """
+    Evaluate the given models' answers for one row; returns {model_name: result_row}
+    
+    With BATCH_JUDGE, the answers not yet journaled are scored in one judge
+    request, and only those missing from its response are sent one by one.
+    """
+    
+    results = {}
+    pending = {}
+    for model_name, column_name in models_config.items():
+        key = evaluation_key(model_name, index, row['Questions'], row[column_name])
+        if journal and key in journal.done and not journal.done[key]["error"]:
+            results[model_name] = journal.done[key]["row"]
+        else:
+            pending[model_name] = column_name
+    
+    evaluations = {}
+    if BATCH_JUDGE and len(pending) > 1:
+        evaluations = evaluate_answers_batch(
+            row['Category'], row['Questions'], row['Golden Answers'],
+            {model_name: row[column_name] for model_name, column_name in pending.items()},
+            row['Context']
+        )
+    
+    for model_name, column_name in pending.items():
+        results[model_name] = evaluate_row(row, index, column_name, model_name, journal, evaluations.get(model_name))
+    
+    return {model_name: results[model_name] for model_name in models_config}
+
+def evaluate_models(rows, models_config, journal=None, on_model_done=None):
+    """
+    Evaluate every (model, row) pair on a pool of JUDGE_WORKERS threads
+    (one judge job per row with BATCH_JUDGE, one per pair otherwise)
+    
+    rows is an iterable of (index, row) pairs: a DataFrame's iterrows() or a
+    live stream of answered records, whose judge jobs are queued as each
+    record arrives. Results are collected per model in row order. An
+    evaluation that fails is re-queued on its own, up to JUDGE_RETRIES times.
+    on_model_done(model_name, results) is called from the calling thread as
+    soon as all of a model's rows are evaluated. Returns {model_name: results}.
+    """
+    
+    collectors = {model_name: [] for model_name in models_config}
+    remaining = {model_name: 0 for model_name in models_config}
+    futures = {}
+    
+    with ThreadPoolExecutor(max_workers=JUDGE_WORKERS) as pool:
+        for position, (index, row) in enumerate(rows):
+            for model_name in models_config:
+                collectors[model_name].append(None)
+                remaining[model_name] += 1
+            
+            # One job per row when its answers are judged together, else one per model
+            if BATCH_JUDGE:
+                jobs = [models_config]
+            else:
+                jobs = [{model_name: column_name} for model_name, column_name in models_config.items()]
+            for job in jobs:
+                futures[pool.submit(evaluate_question, row, index, job, journal)] = (position, index, row, 0)
         
-        # Add result
-        result_row = {
-            'Category': category,
-            'Questions': question,
-            'Golden Answers': golden_answer,
-            f'{model_name} Answer': model_answer,
-            'Context': context,
-            'Faithfulness Score': evaluation['faithfulness'],
-            'Answer Relevance Score': evaluation['answer_relevance'],
-            'Context Relevance Score': evaluation['context_relevance'],
-            'correctness Score': evaluation['correctness'],
-            'Overall Score': evaluation['overall_score'],
-            'Evaluation Explanation': evaluation['explanation']
-        }
-        
-        results.append(result_row)
+        total_rows = len(next(iter(collectors.values()), []))
+        total = sum(remaining.values())
+        print(f"Scheduled {total} evaluations in {len(futures)} judge jobs on {JUDGE_WORKERS} workers...")
         
-        # Short pause to avoid API rate limits
-        time.sleep(1)
+        completed = 0
+        retried = 0
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                position, index, row, attempt = futures.pop(future)
+                for model_name, result_row in future.result().items():
+                    # Re-queue just this model's evaluation of the row
+                    if is_failed(result_row) and attempt < JUDGE_RETRIES:
+                        job = {model_name: models_config[model_name]}
+                        retry = pool.submit(evaluate_question, row, index, job, journal)
+                        futures[retry] = (position, index, row, attempt + 1)
+                        pending.add(retry)
+                        retried += 1
+                        continue
+                    
+                    if is_unparseable(result_row):
+                        count_parse_failure(model_name)
+                    collectors[model_name][position] = result_row
+                    remaining[model_name] -= 1
+                    completed += 1
+                    print(f"Processed {model_name} - row {position + 1}/{total_rows} ({completed}/{total} overall)")
+                    
+                    if remaining[model_name] == 0 and on_model_done:
+                        on_model_done(model_name, collectors[model_name])
+    
+    if retried:
+        print(f"Re-queued {retried} failed evaluations")
+    
+    return collectors
+
+def process_model_answers(df, model_column, model_name, journal=None):
+    """
+    Process and evaluate answers for a specific model
+    """
+    
+    print(f"Starting to process {model_name} answers - {len(df)} rows...")
+    return evaluate_models(df.iterrows(), {model_name: model_column}, journal)[model_name]
+
+# Score columns of an evaluation row -> metric names used in the reports
+SCORE_COLUMNS = {
+    'Faithfulness Score': 'Faithfulness',
+    'Answer Relevance Score': 'Answer Relevance',
+    'Context Relevance Score': 'Context Relevance',
+    'correctness Score': 'correctness',
+    'Overall Score': 'Overall Score'
+}
+
+def build_reports(all_results):
+    """
+    Compute every summary, category breakdown and comparison table for the
+    given {model_name: results} in one groupby over a long-format frame
+    (one row per model, question and metric)
+    """
+    
+    models = list(all_results)
+    metrics = list(SCORE_COLUMNS.values())
+    
+    frames = [pd.DataFrame(results, columns=['Category', *SCORE_COLUMNS]) for results in all_results.values()]
+    scores = pd.concat(frames, ignore_index=True)
+    values = scores[list(SCORE_COLUMNS)].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    
+    # Models, metrics and categories as integer codes (-1: row without a category)
+    model_codes = np.repeat(np.arange(len(models)), [len(frame) for frame in frames])
+    category_codes, categories = pd.factorize(scores['Category'], sort=True)
+    labels = {'Model': pd.Index(models), 'Metric': pd.Index(metrics), 'Category': pd.Index(categories)}
+    
+    long_df = pd.DataFrame({
+        'Model': np.tile(model_codes, len(metrics)),
+        'Metric': np.repeat(np.arange(len(metrics)), len(scores)),
+        'Category': np.tile(category_codes, len(metrics)),
+        'Score': values.T.ravel()
+    })
+    
+    def relabel(frame):
+        index = frame.index.remove_unused_levels()
+        frame.index = index.set_levels([labels[name][level] for name, level in zip(index.names, index.levels)])
+        return frame
     
-    return results
+    # The single pass over the data: partial aggregates per model, metric and category
+    grouped = long_df.groupby(['Model', 'Metric', 'Category'])['Score'].agg(['sum', 'count', 'min', 'max'])
+    
+    # Per model and metric, combined from the partial aggregates (uncategorized rows included)
+    totals = grouped.groupby(level=['Model', 'Metric']).agg({'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'})
+    summary = relabel(pd.DataFrame({
+        'Average Score': totals['sum'] / totals['count'].where(totals['count'] > 0),
+        'Min Score': totals['min'],
+        'Max Score': totals['max']
+    }))
+    
+    # Mean per model, category and metric, one column per metric
+    by_category = grouped[grouped.index.get_level_values('Category') >= 0]
+    category_means = relabel(by_category['sum'] / by_category['count'].where(by_category['count'] > 0))
+    category_means = category_means.unstack('Metric').reindex(columns=metrics).round(2)
+    
+    overall = summary['Average Score'].unstack('Metric').reindex(columns=metrics)
+    overall.index = pd.MultiIndex.from_arrays([overall.index, ['OVERALL'] * len(overall)], names=['Model', 'Category'])
+    
+    # Comparison rows: each model's categories followed by its OVERALL row
+    comparison_df = pd.concat([category_means, overall]).reset_index()
+    order = comparison_df['Model'].map({model: n for n, model in enumerate(models)})
+    comparison_df = comparison_df.iloc[np.lexsort([comparison_df['Category'].eq('OVERALL'), order])]
+    comparison_df = comparison_df[['Model', 'Category', *metrics]].reset_index(drop=True)
+    comparison_df.columns.name = None
+    
+    # One pivot for all metrics: columns are (metric, model)
+    pivots = comparison_df.pivot(index='Category', columns='Model', values=metrics)
+    
+    return {
+        'summary': summary,
+        'category_means': category_means,
+        'comparison': comparison_df,
+        'pivots': {metric: pivots[metric] for metric in metrics}
+    }
 
-def create_evaluation_report(results, output_file, model_name):
+def create_evaluation_report(results, output_file, model_name, reports=None):
     """
     Create evaluation report and save it
     """
     
     # Create DataFrame from results
     results_df = pd.DataFrame(results)
+    reports = reports or build_reports({model_name: results})
+    summary = reports['summary'].loc[model_name]
     
-    # Save results to Excel file
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-        # Main table
-        results_df.to_excel(writer, sheet_name='Detailed Evaluation', index=False)
-        
-        # Summary statistics
-        summary_stats = {
-            'Metric': ['Faithfulness', 'Answer Relevance', 'Context Relevance', 'correctness' , 'Overall Score'],
-            'Average Score': [
-                results_df['Faithfulness Score'].mean(),
-                results_df['Answer Relevance Score'].mean(),
-                results_df['Context Relevance Score'].mean(),
-                results_df['correctness Score'].mean(),
-                results_df['Overall Score'].mean()
-            ],
-            'Min Score': [
-                results_df['Faithfulness Score'].min(),
-                results_df['Answer Relevance Score'].min(),
-                results_df['Context Relevance Score'].min(),
-                results_df['correctness Score'].min(),
-                results_df['Overall Score'].min()
-            ],
-            'Max Score': [
-                results_df['Faithfulness Score'].max(),
-                results_df['Answer Relevance Score'].max(),
-                results_df['Context Relevance Score'].max(),
-                results_df['correctness Score'].max(),
-                results_df['Overall Score'].max()
-            ]
-        }
-        
-        summary_df = pd.DataFrame(summary_stats)
-        summary_df.to_excel(writer, sheet_name='Summary Statistics', index=False)
-        
-        # Evaluation by category
-        category_stats = results_df.groupby('Category').agg({
-            'Faithfulness Score': 'mean',
-            'Answer Relevance Score': 'mean',
-            'Context Relevance Score': 'mean',
-            'correctness Score': 'mean',
-            'Overall Score': 'mean'
-        }).round(2)
-        
-        category_stats.to_excel(writer, sheet_name='Category Analysis')
+    # Save detailed results as Parquet
+    table_file = os.path.splitext(output_file)[0] + ".parquet"
+    if results_store.write_table(results_df, table_file, OUTPUT_CONTEXTS):
+        print(f"{model_name} results saved to: {table_file}")
     
-    print(f"{model_name} report saved to: {output_file}")
+    # Export the report to Excel
+    if EXPORT_EXCEL or not results_store.HAVE_PARQUET:
+        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+            # Main table
+            results_df.to_excel(writer, sheet_name='Detailed Evaluation', index=False)
+            
+            # Summary statistics
+            summary_df = summary.rename_axis('Metric').reset_index()
+            summary_df['Metric'] = summary_df['Metric'].astype(str)
+            summary_df.to_excel(writer, sheet_name='Summary Statistics', index=False)
+            
+            # Evaluation by category
+            category_stats = reports['category_means'].loc[model_name].set_axis(list(SCORE_COLUMNS), axis=1)
+            category_stats.to_excel(writer, sheet_name='Category Analysis')
+        
+        print(f"{model_name} report saved to: {output_file}")
     
     # Print quick summary
     print(f"\n=== {model_name} Results Summary ===")
-    print(f"Average Faithfulness Score: {results_df['Faithfulness Score'].mean():.2f}")
-    print(f"Average Answer Relevance Score: {results_df['Answer Relevance Score'].mean():.2f}")
-    print(f"Average Context Relevance Score: {results_df['Context Relevance Score'].mean():.2f}")
-    print(f"Average correctness Score: {results_df['correctness Score'].mean():.2f}")
-    print(f"Average Overall Score: {results_df['Overall Score'].mean():.2f}")
+    for column, metric in SCORE_COLUMNS.items():
+        print(f"Average {column}: {summary.loc[metric, 'Average Score']:.2f}")
 
-def create_comparison_report(all_results, output_file):
+def create_comparison_report(all_results, output_file, reports=None):
     """
     Create a comparison report across all models
     """
     
-    comparison_data = []
+    reports = reports or build_reports(all_results)
+    comparison_df = reports['comparison']
     
-    for model_name, results in all_results.items():
-        results_df = pd.DataFrame(results)
-        
-        # Calculate averages for each category
-        category_averages = results_df.groupby('Category').agg({
-            'Faithfulness Score': 'mean',
-            'Answer Relevance Score': 'mean',
-            'Context Relevance Score': 'mean',
-            'correctness Score': 'mean',
-            'Overall Score': 'mean'
-        }).round(2)
-        
-        # Add model name and overall averages
-        for category in category_averages.index:
-            comparison_data.append({
-                'Model': model_name,
-                'Category': category,
-                'Faithfulness': category_averages.loc[category, 'Faithfulness Score'],
-                'Answer Relevance': category_averages.loc[category, 'Answer Relevance Score'],
-                'Context Relevance': category_averages.loc[category, 'Context Relevance Score'],
-                'correctness': category_averages.loc[category, 'correctness Score'],
-                'Overall Score': category_averages.loc[category, 'Overall Score']
-            })
-        
-        # Add overall average across all categories
-        comparison_data.append({
-            'Model': model_name,
-            'Category': 'OVERALL',
-            'Faithfulness': results_df['Faithfulness Score'].mean(),
-            'Answer Relevance': results_df['Answer Relevance Score'].mean(),
-            'Context Relevance': results_df['Context Relevance Score'].mean(),
-            'correctness': results_df['correctness Score'].mean(),
-            'Overall Score': results_df['Overall Score'].mean()
-        })
-    
-    # Create comparison DataFrame
-    comparison_df = pd.DataFrame(comparison_data)
+    # Save comparison table as Parquet
+    table_file = os.path.splitext(output_file)[0] + ".parquet"
+    if results_store.write_table(comparison_df, table_file):
+        print(f"Comparison table saved to: {table_file}")
     
-    # Save comparison report
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-        comparison_df.to_excel(writer, sheet_name='Model Comparison', index=False)
-        
-        # Create pivot tables for better visualization
-        pivot_faithfulness = comparison_df.pivot(index='Category', columns='Model', values='Faithfulness')
-        pivot_relevance = comparison_df.pivot(index='Category', columns='Model', values='Answer Relevance')
-        pivot_context = comparison_df.pivot(index='Category', columns='Model', values='Context Relevance')
-        pivot_correctness = comparison_df.pivot(index='Category', columns='Model', values='correctness')
-        pivot_overall = comparison_df.pivot(index='Category', columns='Model', values='Overall Score')
+    # Export the comparison report to Excel
+    if EXPORT_EXCEL or not results_store.HAVE_PARQUET:
+        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+            comparison_df.to_excel(writer, sheet_name='Model Comparison', index=False)
+            
+            # Pivot tables for better visualization
+            for metric, pivot in reports['pivots'].items():
+                pivot.to_excel(writer, sheet_name=f'{metric} Comparison')
         
-        pivot_faithfulness.to_excel(writer, sheet_name='Faithfulness Comparison')
-        pivot_relevance.to_excel(writer, sheet_name='Answer Relevance Comparison')
-        pivot_context.to_excel(writer, sheet_name='Context Relevance Comparison')
-        pivot_correctness.to_excel(writer, sheet_name='correctness Comparison')
-        pivot_overall.to_excel(writer, sheet_name='Overall Score Comparison')
-    
-    print(f"Comparison report saved to: {output_file}")
+        print(f"Comparison report saved to: {output_file}")
+
 
 
 
@@ -265,69 +628,102 @@ def create_comparison_report(all_results, output_file):
 
 
 
+# Models to evaluate: model name -> answer column (main.py names each answer column after its model)
+MODELS_CONFIG = {name: name for name in providers.enabled_models()}
+
+def run_evaluation(rows, models_config):
+    """
+    Evaluate (index, row) pairs for the given models and write every report
+    """
+    
+    journal = checkpoint.Journal(EVAL_JOURNAL)
+    if journal.done:
+        print(f"Resuming from {EVAL_JOURNAL} ({len(journal.done)} journaled evaluations)")
+    
+    def write_model_report(model_name, results):
+        # Create individual report as soon as the model's rows are in
+        output_file = f"../outputFiles/{model_name.lower()}_evaluation_results.xlsx"
+        with metrics.timed("reports", model_name):
+            create_evaluation_report(results, output_file, model_name)
+        print(f"{model_name} evaluation completed!")
+    
+    print(f"\n{'='*50}")
+    print(f"Evaluating {', '.join(models_config)}...")
+    print(f"{'='*50}")
+    
+    # Evaluate all models concurrently and store results for comparison
+    try:
+        all_results = evaluate_models(rows, models_config, journal, write_model_report)
+    finally:
+        journal.close()
+    
+    # Create comparison report
+    if all_results:
+        print(f"\n{'='*50}")
+        print("Creating comparison report...")
+        print(f"{'='*50}")
+        with metrics.timed("reports"):
+            create_comparison_report(all_results, "../outputFiles/models_comparison_report.xlsx")
+    
+    if parse_failures:
+        print(f"Unusable judge responses per model: {parse_failures}")
+    
+    print("\nAll evaluations completed successfully!")
+    print(f"Generated files:")
+    extensions = [".parquet"] if results_store.HAVE_PARQUET else []
+    if EXPORT_EXCEL or not results_store.HAVE_PARQUET:
+        extensions.append(".xlsx")
+    for model_name in all_results.keys():
+        for extension in extensions:
+            print(f"- {model_name.lower()}_evaluation_results{extension}")
+    for extension in extensions:
+        print(f"- models_comparison_report{extension}")
+    
+    return all_results
+
+def evaluate_records(records, models_config=None):
+    """
+    Evaluate answered records (dicts with the results Excel columns) as they are produced
+    """
+    
+    print("Starting streaming evaluation for all models...")
+    return run_evaluation(enumerate(records), models_config or MODELS_CONFIG)
 
 def main():
     """
     Main function
     """
     
-    # Input Excel file path
-    input_file = "../middleFiles/results_with_all_contexts.xlsx"
-    
-    # Define models to evaluate
-    models_config = {
-        'gpt-4o': 'gpt-4o',
-        'DeepSeek Chat': 'DeepSeek Chat', 
-        'Claude3.7': 'Claude3.7',
-        'Gemini2.5Pro': 'Gemini2.5Pro',
-        'Grok3': 'Grok3'
-    }
+    metrics.start_exporter()
     
     try:
         print("Starting evaluation process for all models...")
         
-        # Read the input file once
-        df = pd.read_excel(input_file)
+        # Read the input once, from the columnar table when main.py wrote one
+        with metrics.timed("load_input"):
+            if results_store.HAVE_PARQUET and os.path.exists(INPUT_TABLE):
+                input_file = INPUT_TABLE
+                df = results_store.read_table(INPUT_TABLE, INPUT_CONTEXTS)
+            else:
+                input_file = INPUT_EXCEL
+                df = pd.read_excel(input_file)
         print(f"Loaded {len(df)} rows from {input_file}")
         
-        # Store all results for comparison
-        all_results = {}
-        
-        # Process each model
-        for model_name, column_name in models_config.items():
-            print(f"\n{'='*50}")
-            print(f"Processing {model_name}...")
-            print(f"{'='*50}")
-            
-            # Check if column exists
+        # Check which model columns exist
+        available = {}
+        for model_name, column_name in MODELS_CONFIG.items():
             if column_name not in df.columns:
                 print(f"Warning: Column '{column_name}' not found in the data. Skipping {model_name}.")
                 continue
-            
-            # Process model answers
-            results = process_model_answers(df, column_name, model_name)
-            
-            # Store results for comparison
-            all_results[model_name] = results
-            
-            # Create individual report
-            output_file = f"../outputFiles/{model_name.lower()}_evaluation_results.xlsx"
-            create_evaluation_report(results, output_file, model_name)
-            
-            print(f"{model_name} evaluation completed!")
+            available[model_name] = column_name
         
-        # Create comparison report
-        if all_results:
-            print(f"\n{'='*50}")
-            print("Creating comparison report...")
-            print(f"{'='*50}")
-            create_comparison_report(all_results, "../outputFiles/models_comparison_report.xlsx")
+        run_evaluation(df.iterrows(), available)
         
-        print("\nAll evaluations completed successfully!")
-        print(f"Generated files:")
-        for model_name in all_results.keys():
-            print(f"- {model_name.lower()}_evaluation_results.xlsx")
-        print("- models_comparison_report.xlsx")
+        report = metrics.write_report(RUN_REPORT, {
+            "retries": rate_limiter.retry_counts,
+            "judge_parse_failures": parse_failures
+        })
+        print(f"Estimated API cost: ${report['estimated_cost_usd']:.4f}. Run report saved to: {RUN_REPORT}")
         
     except Exception as e:
         print(f"An error occurred: {e}")
@@ -0,0 +1,213 @@
+"""
+Local vector index, usable in place of a Pinecone index.
+
+LocalIndex implements the part of the Pinecone Index API the pipeline uses
+(upsert, delete, query, describe_index_stats). Vectors are kept normalized
+in a memory-mapped float32 file so cosine top-k is a single matrix-vector
+product; ids and metadata live in a SQLite file next to it. For large
+corpora an approximate IVF index (k-means buckets, probing the closest
+few) can be used instead of the exact scan.
+"""
+import json
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+Match = namedtuple("Match", ["id", "score", "metadata"])
+QueryResult = namedtuple("QueryResult", ["matches"])
+
+# Use the approximate index once there are at least this many vectors (0 disables it)
+APPROX_MIN_VECTORS = 200000
+APPROX_PROBES = 8           # buckets scanned per query
+APPROX_KMEANS_ITERATIONS = 10
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class LocalIndex:
+    """In-process cosine index persisted under a directory"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.lock = threading.RLock()
+
+        self.conn = sqlite3.connect(os.path.join(path, "index.sqlite"), check_same_thread=False)
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS vectors (id TEXT PRIMARY KEY, row INTEGER UNIQUE, metadata TEXT)"
+            )
+
+        settings = dict(self.conn.execute("SELECT key, value FROM settings"))
+        self.dim = int(settings["dim"]) if "dim" in settings else None
+        self.capacity = int(settings.get("capacity", 0))
+
+        self.ids = [None] * self.capacity
+        for vector_id, row in self.conn.execute("SELECT id, row FROM vectors"):
+            self.ids[row] = vector_id
+        self.count = self.conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+        self.rows = {vector_id: row for row, vector_id in enumerate(self.ids[:self.count])}
+
+        self.matrix = None
+        if self.dim:
+            self.matrix = np.memmap(self._matrix_path(), dtype=np.float32, mode="r+",
+                                    shape=(self.capacity, self.dim))
+        self._ivf = None
+
+    def _matrix_path(self):
+        return os.path.join(self.path, "vectors.f32")
+
+    def _set(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO settings VALUES (?, ?)", (key, str(value)))
+
+    def _grow(self, needed):
+        """Make room for `needed` rows, doubling the memory-mapped file"""
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, 2 * self.capacity, 1024)
+
+        if self.matrix is not None:
+            self.matrix.flush()
+            del self.matrix
+        with open(self._matrix_path(), "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+
+        self.matrix = np.memmap(self._matrix_path(), dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self.ids.extend([None] * (capacity - self.capacity))
+        self.capacity = capacity
+        self._set("capacity", capacity)
+
+    def upsert(self, vectors):
+        """Insert or overwrite (id, values, metadata) tuples"""
+        if not vectors:
+            return
+        with self.lock, self.conn:
+            if self.dim is None:
+                self.dim = len(vectors[0][1])
+                self._set("dim", self.dim)
+
+            values = _normalize(np.asarray([v[1] for v in vectors], dtype=np.float32))
+            new_ids = [v[0] for v in vectors if v[0] not in self.rows]
+            self._grow(self.count + len(set(new_ids)))
+
+            for (vector_id, _, metadata), vector in zip(vectors, values):
+                row = self.rows.get(vector_id)
+                if row is None:
+                    row = self.count
+                    self.rows[vector_id] = row
+                    self.ids[row] = vector_id
+                    self.count += 1
+                self.matrix[row] = vector
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO vectors VALUES (?, ?, ?)",
+                    (vector_id, row, json.dumps(metadata or {}))
+                )
+
+            self.matrix.flush()
+            self._ivf = None
+
+    def delete(self, ids):
+        """Remove vectors by id, filling each hole with the last row"""
+        with self.lock, self.conn:
+            for vector_id in ids:
+                row = self.rows.pop(vector_id, None)
+                if row is None:
+                    continue
+                self.conn.execute("DELETE FROM vectors WHERE id = ?", (vector_id,))
+
+                last = self.count - 1
+                if row != last:
+                    moved_id = self.ids[last]
+                    self.matrix[row] = self.matrix[last]
+                    self.ids[row] = moved_id
+                    self.rows[moved_id] = row
+                    self.conn.execute("UPDATE vectors SET row = ? WHERE id = ?", (row, moved_id))
+                self.ids[last] = None
+                self.count = last
+
+            if self.matrix is not None:
+                self.matrix.flush()
+            self._ivf = None
+
+    def describe_index_stats(self):
+        return {"total_vector_count": self.count, "dimension": self.dim}
+
+    def query(self, vector, top_k=3, include_metadata=True):
+        """Cosine top-k; returns an object with a Pinecone-style .matches list"""
+        with self.lock:
+            if self.count == 0:
+                return QueryResult(matches=[])
+
+            q = _normalize(np.asarray(vector, dtype=np.float32))
+            if APPROX_MIN_VECTORS and self.count >= APPROX_MIN_VECTORS:
+                rows, scores = self._approx_search(q, top_k)
+            else:
+                rows, scores = self._exact_search(q, top_k)
+
+            ids = [self.ids[row] for row in rows]
+            metadata = {}
+            if include_metadata and ids:
+                found = self.conn.execute(
+                    f"SELECT id, metadata FROM vectors WHERE id IN ({','.join('?' * len(ids))})", ids
+                ).fetchall()
+                metadata = {vector_id: json.loads(value) for vector_id, value in found}
+
+        return QueryResult(matches=[
+            Match(id=vector_id, score=float(score), metadata=metadata.get(vector_id))
+            for vector_id, score in zip(ids, scores)
+        ])
+
+    def _exact_search(self, q, top_k, rows=None):
+        """Score every row (or the given rows) and return the best top_k"""
+        candidates = self.matrix[:self.count] if rows is None else self.matrix[rows]
+        scores = candidates @ q
+        k = min(top_k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        if rows is not None:
+            return rows[best], scores[best]
+        return best, scores[best]
+
+    def _approx_search(self, q, top_k):
+        if self._ivf is None:
+            self._ivf = self._build_ivf()
+        centroids, buckets = self._ivf
+
+        probes = np.argsort(-(centroids @ q))[:APPROX_PROBES]
+        rows = np.concatenate([buckets[p] for p in probes])
+        if len(rows) < top_k:
+            return self._exact_search(q, top_k)
+        return self._exact_search(q, top_k, rows)
+
+    def _build_ivf(self):
+        """Spherical k-means over the stored vectors; returns (centroids, rows per bucket)"""
+        data = np.asarray(self.matrix[:self.count])
+        n_lists = max(1, int(np.sqrt(self.count)))
+        rng = np.random.default_rng(0)
+
+        sample = data[rng.choice(self.count, size=min(self.count, 64 * n_lists), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        for _ in range(APPROX_KMEANS_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[assignment == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = _normalize(centroids)
+
+        assignment = np.empty(self.count, dtype=np.int64)
+        for start in range(0, self.count, 65536):
+            assignment[start:start + 65536] = np.argmax(data[start:start + 65536] @ centroids.T, axis=1)
+
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+        buckets = [order[bounds[c]:bounds[c + 1]] for c in range(n_lists)]
+        return centroids, buckets
@@ -1,3 +1,13 @@
+// Results API of simple_server.py: the comparison tables computed once on the server
+const RESULTS_API = 'http://localhost:8000/results';
+
+// {columns, rows} as one object per row, like XLSX.utils.sheet_to_json
+function tableRecords(table) {
+    return table.rows.map(row => Object.fromEntries(
+        table.columns.map((col, i) => [col, row[i] === null ? "" : row[i]])
+    ));
+}
+
 class ExcelChartsManager {
     constructor() {
         this.data = {};
@@ -7,11 +17,34 @@ class ExcelChartsManager {
     }
 
     async init() {
-        await this.loadExcelFile();
+        await this.loadData();
         this.setupEventListeners();
         this.displayChart(this.currentChart);
     }
 
+    async loadData() {
+        try {
+            const response = await fetch(`${RESULTS_API}/comparison`);
+            if (!response.ok) {
+                throw new Error(`Results API returned ${response.status}`);
+            }
+            
+            const comparison = await response.json();
+            Object.entries(comparison.sheets).forEach(([sheetName, table]) => {
+                this.data[sheetName] = tableRecords(table);
+            });
+            
+            console.log('Loaded chart data from the results API:', Object.keys(this.data));
+            
+            document.getElementById('charts-loading').style.display = 'none';
+            document.getElementById('chart-container').style.display = 'block';
+        } catch (error) {
+            // Without the Python server, parse the Excel report here
+            console.warn('Results API unavailable, reading the Excel file:', error);
+            await this.loadExcelFile();
+        }
+    }
+
     async loadExcelFile() {
         try {
             document.getElementById('charts-loading').style.display = 'block';
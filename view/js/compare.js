@@ -1,3 +1,13 @@
+// Results API of simple_server.py: the comparison tables computed once on the server
+const RESULTS_API = 'http://localhost:8000/results';
+
+// {columns, rows} as one object per row, like XLSX.utils.sheet_to_json
+function tableRecords(table) {
+    return table.rows.map(row => Object.fromEntries(
+        table.columns.map((col, i) => [col, row[i] === null ? "" : row[i]])
+    ));
+}
+
 class ExcelComparisonDashboard {
     constructor() {
         this.data = {};
@@ -6,11 +16,31 @@ class ExcelComparisonDashboard {
     }
 
     async init() {
-        await this.loadExcelFile();
+        await this.loadData();
         this.setupEventListeners();
         this.displaySheet(this.currentSheet);
     }
 
+    async loadData() {
+        try {
+            const response = await fetch(`${RESULTS_API}/comparison`);
+            if (!response.ok) {
+                throw new Error(`Results API returned ${response.status}`);
+            }
+            
+            const comparison = await response.json();
+            Object.entries(comparison.sheets).forEach(([sheetName, table]) => {
+                this.data[sheetName] = tableRecords(table);
+            });
+            
+            console.log('Loaded comparison tables from the results API:', Object.keys(this.data));
+        } catch (error) {
+            // Without the Python server, parse the Excel report here
+            console.warn('Results API unavailable, reading the Excel file:', error);
+            await this.loadExcelFile();
+        }
+    }
+
     async loadExcelFile() {
         try {
             // Show loading message
@@ -18,8 +18,120 @@ const subTabs = [
   { label: "Category Analysis", key: "category" }
 ];
 
-// Render table from XLSX
-function renderTable(model, sheetName, elementId) {
+// Results API of simple_server.py: tables computed once on the server, revalidated with ETags
+const RESULTS_API = "http://localhost:8000/results";
+const PAGE_ROWS = 100;
+const modelResults = {};
+
+// Summary and category tables of a model, fetched once per page load
+function fetchModelResults(model) {
+  if (!modelResults[model]) {
+    modelResults[model] = fetch(`${RESULTS_API}/models/${encodeURIComponent(model)}`)
+      .then(res => {
+        if (!res.ok) throw new Error(`Results API returned ${res.status}`);
+        return res.json();
+      })
+      .catch(e => {
+        delete modelResults[model];
+        throw e;
+      });
+  }
+  return modelResults[model];
+}
+
+// Table HTML from {columns, rows}
+function tableHtml(columns, rows) {
+  let html = "<table><thead><tr>";
+  columns.forEach(col => { html += `<th>${col}</th>`; });
+  html += "</tr></thead><tbody>";
+  rows.forEach(row => {
+    html += "<tr>";
+    row.forEach(val => { html += `<td>${val === null ? "" : val}</td>`; });
+    html += "</tr>";
+  });
+  html += "</tbody></table>";
+  return html;
+}
+
+// Render one page of a model's detailed rows
+function renderRows(model, offset, elementId) {
+  const element = document.getElementById(elementId);
+  if (!element) {
+    console.error(`Element ${elementId} not found`);
+    return;
+  }
+  
+  fetch(`${RESULTS_API}/models/${encodeURIComponent(model)}/rows?offset=${offset}&limit=${PAGE_ROWS}`)
+    .then(res => {
+      if (!res.ok) throw new Error(`Results API returned ${res.status}`);
+      return res.json();
+    })
+    .then(page => {
+      if (!page.total) {
+        element.innerHTML = "<p>No data found.</p>";
+        return;
+      }
+      const last = Math.min(page.offset + page.rows.length, page.total);
+      let html = tableHtml(page.columns, page.rows);
+      if (page.total > page.limit) {
+        html += `
+          <div class="table-pager">
+            <button class="pager-prev"${page.offset === 0 ? " disabled" : ""}>Previous</button>
+            <span>Rows ${page.offset + 1}-${last} of ${page.total}</span>
+            <button class="pager-next"${last >= page.total ? " disabled" : ""}>Next</button>
+          </div>
+        `;
+      }
+      element.innerHTML = html;
+      const prev = element.querySelector('.pager-prev');
+      const next = element.querySelector('.pager-next');
+      if (prev) prev.addEventListener('click', () => renderRows(model, Math.max(0, page.offset - page.limit), elementId));
+      if (next) next.addEventListener('click', () => renderRows(model, page.offset + page.limit, elementId));
+    })
+    .catch(e => {
+      console.warn("Results API unavailable, reading the Excel file:", e);
+      renderTableFromExcel(model, "Detailed Evaluation", elementId);
+    });
+}
+
+// Render a model's category analysis
+function renderCategoryTable(model, elementId) {
+  const element = document.getElementById(elementId);
+  fetchModelResults(model)
+    .then(results => {
+      element.innerHTML = results.categories.rows.length
+        ? tableHtml(results.categories.columns, results.categories.rows)
+        : "<p>No data found.</p>";
+    })
+    .catch(e => {
+      console.warn("Results API unavailable, reading the Excel file:", e);
+      renderTableFromExcel(model, "Category Analysis", elementId);
+    });
+}
+
+// Render summary cards
+function renderSummaryCards(model) {
+  fetchModelResults(model)
+    .then(results => {
+      let html = "";
+      results.summary.rows.forEach(([metric, average]) => {
+        html += `
+          <div class="summary-card">
+            <h2>${metric}</h2>
+            <div class="score">${Number(average).toFixed(2)}</div>
+          </div>
+        `;
+      });
+      document.getElementById('summary-cards').innerHTML = html;
+    })
+    .catch(e => {
+      console.warn("Results API unavailable, reading the Excel file:", e);
+      renderSummaryCardsFromExcel(model);
+    });
+}
+
+// Render table from XLSX (without the results API)
+function renderTableFromExcel(model, sheetName, elementId) {
   const element = document.getElementById(elementId);
   if (!element) {
     console.error(`Element ${elementId} not found`);
@@ -65,8 +177,8 @@ function renderTable(model, sheetName, elementId) {
     });
 }
 
-// Render summary cards
-function renderSummaryCards(model) {
+// Render summary cards from XLSX (without the results API)
+function renderSummaryCardsFromExcel(model) {
   if (!modelFiles[model]) {
     document.getElementById('summary-cards').innerHTML = "";
     return;
@@ -119,10 +231,10 @@ function switchTab(sub) {
     document.getElementById('current-tab-content').style.display = 'block';
     document.getElementById('summary-cards').style.display = 'flex';
     renderSummaryCards(model);
-    renderTable(model, "Detailed Evaluation", "current-table");
+    renderRows(model, 0, "current-table");
   } else if (sub === 'category') {
     document.getElementById('category-tab-content').style.display = 'block';
-    renderTable(model, "Category Analysis", "category-table");
+    renderCategoryTable(model, "category-table");
   }
   
   console.log("Tab switch complete");
@@ -3,12 +3,14 @@ class PythonRunner {
         this.isRunning = false;
         this.outputLines = [];
         this.generatedFiles = [];
+        this.serverUrl = 'http://localhost:8000';
         this.init();
     }
 
     init() {
         this.setupEventListeners();
         this.checkForExistingFiles();
+        this.resumeJob();
     }
 
     setupEventListeners() {
@@ -61,7 +63,7 @@ class PythonRunner {
 
     async runWithLocalServer(scriptName) {
         try {
-            const response = await fetch(`http://localhost:8000/run-python`, {
+            const response = await fetch(`${this.serverUrl}/jobs`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -71,40 +73,98 @@ class PythonRunner {
                 })
             });
 
+            if (response.status === 409) {
+                // The script, or one sharing its output files, is already running: follow that run
+                const busy = await response.json();
+                const running = busy.job.script;
+                const reason = running === scriptName ? '' : ` and shares its output files with ${scriptName}`;
+                this.addOutputLine('info', `${running} is already ${busy.job.status} (job ${busy.job.id})${reason}, following its output`);
+                const result = await this.watchJob(busy.job.id, running);
+                this.finishJob(running, result);
+                return;
+            }
             if (!response.ok) {
                 throw new Error('Local server not available. Please run simple_server.py first.');
             }
 
-            this.addOutputLine('success', `Connected to Python execution server`);
+            const job = await response.json();
+            this.addOutputLine('success', `Connected to Python execution server (job ${job.id})`);
+            if (job.status === 'queued') {
+                this.addOutputLine('info', 'Other scripts are running, waiting for a free worker...');
+            }
             this.addOutputLine('info', `Executing ${scriptName}...`);
             this.addOutputLine('info', '--- Python Script Output ---');
 
-            // Read the response as a stream for real-time output
-            const reader = response.body.getReader();
-            const decoder = new TextDecoder();
+            const result = await this.watchJob(job.id, scriptName);
+            this.finishJob(scriptName, result);
+
+        } catch (error) {
+            throw new Error(`Local server error: ${error.message}`);
+        }
+    }
+
+    watchJob(jobId, scriptName) {
+        // Output arrives as Server-Sent Events; EventSource reconnects on its own and the
+        // server resumes after the last line received, so a dropped connection loses nothing
+        localStorage.setItem('python-runner-job', JSON.stringify({ id: jobId, script: scriptName }));
 
-            while (true) {
-                const { value, done } = await reader.read();
-                if (done) break;
+        return new Promise((resolve, reject) => {
+            const source = new EventSource(`${this.serverUrl}/jobs/${jobId}/events`);
 
-                const chunk = decoder.decode(value);
-                const lines = chunk.split('\n');
+            source.onmessage = (event) => this.handleOutputLine(event.data);
 
-                lines.forEach(line => {
-                    if (line.trim()) {
-                        // Show raw Python output without any modification
-                        this.addOutputLine('output', line);
-                    }
-                });
-            }
+            source.addEventListener('dropped', (event) => {
+                this.addOutputLine('info', `${event.data} earlier lines are no longer kept by the server`);
+            });
 
-            this.addOutputLine('info', '--- End of Python Output ---');
+            source.addEventListener('status', (event) => {
+                source.close();
+                localStorage.removeItem('python-runner-job');
+                resolve(JSON.parse(event.data));
+            });
+
+            source.onerror = () => {
+                if (source.readyState === EventSource.CLOSED) {
+                    localStorage.removeItem('python-runner-job');
+                    reject(new Error(`Lost connection to job ${jobId}`));
+                }
+            };
+        });
+    }
+
+    finishJob(scriptName, result) {
+        this.addOutputLine('info', '--- End of Python Output ---');
+        if (result.status === 'succeeded') {
             this.addOutputLine('success', `${scriptName} completed successfully!`);
             this.updateStatus('completed', 'Execution completed');
             this.checkForGeneratedFiles();
+        } else {
+            this.addOutputLine('error', `${scriptName} ${result.status} (exit code ${result.return_code})`);
+            this.updateStatus('error', `Execution ${result.status}`);
+        }
+    }
+
+    async resumeJob() {
+        // Reattach to a job started before the page was reloaded or closed
+        const saved = JSON.parse(localStorage.getItem('python-runner-job') || 'null');
+        if (!saved || this.isRunning) return;
 
+        try {
+            const response = await fetch(`${this.serverUrl}/jobs/${saved.id}`);
+            if (!response.ok) {
+                localStorage.removeItem('python-runner-job');
+                return;
+            }
+
+            this.isRunning = true;
+            this.updateStatus('running', `Executing ${saved.script}...`);
+            this.addOutputLine('info', `Reattached to ${saved.script} (job ${saved.id})`);
+            this.addOutputLine('info', '--- Python Script Output ---');
+            this.finishJob(saved.script, await this.watchJob(saved.id, saved.script));
         } catch (error) {
-            throw new Error(`Local server error: ${error.message}`);
+            this.addOutputLine('error', `Could not reattach to ${saved.script}: ${error.message}`);
+        } finally {
+            this.isRunning = false;
         }
     }
 
@@ -237,6 +297,40 @@ class PythonRunner {
         }
     }
 
+    handleOutputLine(line) {
+        if (!line.trim()) return;
+
+        // Streamed answers: "[partial <model> #<call>] text" updates one line per call in place,
+        // "[done <model> #<call>] timings" replaces it when the answer is complete
+        const stream = line.match(/^\[(partial|done) (.+) #(\d+)\] (.*)$/);
+        if (stream) {
+            const [, state, model, callId, text] = stream;
+            this.updateStreamLine(callId, `${model}: ${text}`, state === 'done');
+            return;
+        }
+
+        // Show raw Python output without any modification
+        this.addOutputLine('output', line);
+    }
+
+    updateStreamLine(callId, message, finished) {
+        this.streamLines = this.streamLines || {};
+        let line = this.streamLines[callId];
+
+        if (!line) {
+            this.addOutputLine('output', message);
+            line = document.getElementById('output-display').lastElementChild;
+            this.streamLines[callId] = line;
+        } else {
+            line.querySelector('.message').textContent = message;
+        }
+
+        line.classList.toggle('streaming', !finished);
+        if (finished) {
+            delete this.streamLines[callId];
+        }
+    }
+
     addOutputLine(type, message) {
         const timestamp = new Date().toLocaleTimeString();
         const outputDisplay = document.getElementById('output-display');
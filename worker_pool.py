@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Warm interpreter pool for simple_server.py.
+
+Starting main.py or test2.py in a fresh interpreter spends seconds importing
+pandas, the provider SDKs and tiktoken before any work is done. A warm
+worker is an interpreter that has already imported PRELOAD_MODULES and
+then waits for jobs on stdin. For each job it forks (forkserver style):
+the child runs the script as __main__ with the modules already loaded,
+while the worker itself stays clean and warm for the next job. Only
+third-party modules are preloaded, so edits to the repo's own modules are
+picked up by the next run.
+
+A worker is replaced after MAX_JOBS_PER_WORKER jobs. Its own memory stays
+at the warm-up level, since every job runs (and grows) in a child that
+exits. Needs os.fork (Linux/macOS); elsewhere simple_server.py starts
+every script in a new interpreter.
+
+Protocol: the server writes one JSON job per line to the worker's stdin;
+the worker's stdout carries the script output, framed by MARKER lines
+(ready with the warm-up time, start with the child's pid, end with its exit
+code).
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+# Imported once per worker, before any job runs
+PRELOAD_MODULES = [
+    "numpy", "pandas", "openpyxl", "pyarrow", "tiktoken",
+    "openai", "anthropic", "google.generativeai", "pinecone"
+]
+PRELOAD_ENCODINGS = ["cl100k_base"]  # tiktoken encodings loaded ahead of the first job
+
+MAX_JOBS_PER_WORKER = 20
+READY_TIMEOUT = 120  # seconds a new worker may take to warm up
+
+MARKER = "\x00ayvo-worker"
+
+SUPPORTED = hasattr(os, "fork")
+
+
+def _send(*fields):
+    sys.stdout.write(" ".join([MARKER] + [str(field) for field in fields]) + "\n")
+    sys.stdout.flush()
+
+
+def _run_child(job):
+    """Run the job's script as __main__ in the forked child, then exit with its status"""
+    import runpy
+    import traceback
+
+    # The job's process group, so cancelling it also stops the processes it starts
+    os.setpgid(0, 0)
+    _send("start", job["token"], os.getpid())
+    script = job["script"]
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    sys.stdin = open(os.devnull, "r")
+
+    sys.argv = [script]
+    sys.path[0] = os.path.dirname(os.path.abspath(script))
+    code = 0
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def worker_main():
+    """Entry point of a warm worker process"""
+    os.environ.setdefault("GRPC_ENABLE_FORK_SUPPORT", "1")
+    start = time.perf_counter()
+    for name in PRELOAD_MODULES:
+        try:
+            __import__(name)
+        except Exception:
+            pass
+    if "tiktoken" in sys.modules:
+        for encoding in PRELOAD_ENCODINGS:
+            try:
+                sys.modules["tiktoken"].get_encoding(encoding)
+            except Exception:
+                pass
+    _send("ready", f"{time.perf_counter() - start:.2f}")
+
+    for line in sys.stdin:
+        job = json.loads(line)
+        sys.stdout.flush()
+        pid = os.fork()
+        if pid == 0:
+            _run_child(job)
+
+        # Nothing else is written until the child is gone, so the end marker follows all its output
+        _, status = os.waitpid(pid, 0)
+        _send("end", job["token"], os.waitstatus_to_exitcode(status))
+
+
+class WarmWorker:
+    """Server-side handle of one warm worker process"""
+
+    def __init__(self, python_executable):
+        self.python = python_executable
+        self.jobs = 0
+        self.pid = None  # pid of the running job's process
+        self.warmup_seconds = None
+
+        env = os.environ.copy()
+        env['PYTHONUNBUFFERED'] = '1'
+        self.process = subprocess.Popen(
+            [python_executable, os.path.abspath(__file__)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            bufsize=1,
+            cwd=os.getcwd(),
+            env=env
+        )
+
+    def wait_ready(self):
+        """Block until the worker has imported PRELOAD_MODULES; raises if it died"""
+        timer = threading.Timer(READY_TIMEOUT, self.process.kill)
+        timer.start()
+        try:
+            for line in self.process.stdout:
+                if line.startswith(MARKER + " ready"):
+                    self.warmup_seconds = float(line.split()[2])
+                    return self
+        finally:
+            timer.cancel()
+        self.close()
+        raise RuntimeError("warm worker did not start")
+
+    def run(self, script, on_line, on_start=None):
+        """Run a script in a fork of this worker; returns its exit code"""
+        token = uuid.uuid4().hex
+        self.jobs += 1
+        self.process.stdin.write(json.dumps({"token": token, "script": script}) + "\n")
+        self.process.stdin.flush()
+
+        for line in self.process.stdout:
+            if line.startswith(MARKER):
+                fields = line.split()
+                if fields[1:3] == ["start", token]:
+                    self.pid = int(fields[3])
+                    if on_start:
+                        on_start(self.pid)
+                elif fields[1:3] == ["end", token]:
+                    self.pid = None
+                    return int(fields[3])
+            elif line.strip():
+                on_line(line)
+
+        self.close()
+        raise RuntimeError("warm worker exited during the job")
+
+    def cancel(self):
+        """Terminate the running job and everything it started"""
+        import signal
+
+        if self.pid is not None:
+            try:
+                os.killpg(self.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def healthy(self):
+        return self.process.poll() is None and self.jobs < MAX_JOBS_PER_WORKER
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class WarmPool:
+    """
+    `size` warm workers for one interpreter; a used-up worker is replaced in
+    the background, so the next job normally finds one ready
+    """
+
+    def __init__(self, python_executable, size):
+        self.python = python_executable
+        self.size = size
+        self.idle = []
+        self.busy = 0
+        self.starting = 0
+        self.closed = False
+        self.lock = threading.Lock()
+        self.fill()
+
+    def fill(self):
+        with self.lock:
+            if self.closed:
+                return
+            missing = max(0, self.size - len(self.idle) - self.busy - self.starting)
+            self.starting += missing
+        for _ in range(missing):
+            threading.Thread(target=self._start_worker, name="warm-worker-start", daemon=True).start()
+
+    def _start_worker(self):
+        try:
+            worker = WarmWorker(self.python).wait_ready()
+        except (OSError, RuntimeError) as e:
+            print(f"Could not start a warm worker: {e}")
+            worker = None
+        with self.lock:
+            self.starting -= 1
+            if worker is not None and not self.closed:
+                self.idle.append(worker)
+                return
+        if worker is not None:
+            worker.close()
+
+    def acquire(self, python_executable):
+        """An idle warm worker for this interpreter, or None if none is ready"""
+        with self.lock:
+            if python_executable != self.python or not self.idle:
+                return None
+            self.busy += 1
+            return self.idle.pop()
+
+    def release(self, worker):
+        """Return a worker after its job; it is replaced once it is used up"""
+        with self.lock:
+            self.busy -= 1
+            if worker.healthy() and not self.closed:
+                self.idle.append(worker)
+                return
+        worker.close()
+        self.fill()
+
+    def shutdown(self):
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for worker in idle:
+            worker.close()
+
+
+if __name__ == "__main__":
+    worker_main()